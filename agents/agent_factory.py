@@ -0,0 +1,33 @@
+from langchain_core.messages import SystemMessage
+from langgraph.prebuilt import create_react_agent
+from state import GraphState
+from llm_setup import llm
+
+# agent name -> (도구 식별자, 컴파일된 그래프)
+_compiled_agents = {}
+
+def get_react_agent(name: str, tools, build_prompt, response_format=None):
+    """
+    ReAct 에이전트 그래프를 한 번만 컴파일하여 재사용합니다.
+    요청마다 달라지는 프롬프트(GPS, 질문, 시간 등)는 build_prompt(state)가 실행 시점에 state에서 만들어냅니다.
+    도구 객체가 바뀌면(ToolRegistry 재조회) 해당 에이전트만 다시 컴파일합니다.
+    """
+    tools = list(tools)
+    tool_key = tuple(id(tool) for tool in tools)
+    cached = _compiled_agents.get(name)
+    if cached is not None and cached[0] == tool_key:
+        return cached[1]
+
+    def prompt(state):
+        return [SystemMessage(content=build_prompt(state))] + list(state["messages"])
+
+    agent = create_react_agent(
+        llm,
+        tools=tools,
+        prompt=prompt,
+        state_schema=GraphState,
+        response_format=response_format,
+    )
+    _compiled_agents[name] = (tool_key, agent)
+    print(f"--- [Agent Factory] '{name}' 에이전트 그래프 컴파일 완료 ---")
+    return agent
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+
+class RequestCoalescer:
+    """
+    같은 키에 대한 동시 요청을 하나로 합치는 singleflight 구현입니다.
+    진행 중인 작업이 있으면 새로 실행하지 않고 그 결과를 기다리며,
+    완료된 결과도 완료 시점부터 window 초 동안은 같은 키의 요청에 그대로 공유합니다.
+    실패한 작업(예외, 취소, is_shareable(결과)가 False)은 완료 즉시 스스로 제거해 이후 요청이 다시 실행하게 합니다.
+    """
+
+    def __init__(self, window: float, is_shareable=lambda result: True):
+        self.window = window
+        self.is_shareable = is_shareable
+        self._entries = {}  # key -> {"task": asyncio.Task, "finished_at": 완료 시각 또는 None}
+        self._loop = None
+
+    def _is_expired(self, entry: dict, now: float) -> bool:
+        finished_at = entry["finished_at"]
+        return finished_at is not None and now - finished_at > self.window
+
+    def _failed(self, task: asyncio.Task) -> bool:
+        if not task.done():
+            return False
+        return task.cancelled() or task.exception() is not None or not self.is_shareable(task.result())
+
+    def _purge(self, now: float):
+        expired = [key for key, entry in self._entries.items() if self._is_expired(entry, now)]
+        for key in expired:
+            del self._entries[key]
+
+    async def run(self, key, factory):
+        """
+        key에 해당하는 작업 결과를 반환합니다. 공유할 작업이 없으면 factory()로 새 작업을 시작합니다.
+        실패한 작업의 결과는 공유하지 않습니다.
+        """
+        if self.window <= 0:
+            return await factory()
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 이전 이벤트 루프의 작업은 재사용할 수 없습니다.
+            self._entries = {}
+            self._loop = loop
+
+        now = loop.time()
+        self._purge(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._failed(entry["task"]):
+                print(f"--- [Coalescer] '{key}' 진행 중/최근 결과를 공유합니다 ---")
+                # 기다리던 요청 하나가 취소되어도 공유 작업은 계속 실행되도록 shield로 감쌉니다.
+                return await asyncio.shield(entry["task"])
+
+        task = asyncio.ensure_future(factory())
+        entry = {"task": task, "finished_at": None}
+        entries = self._entries
+
+        def on_done(_):
+            # 공유 기간은 작업이 끝난 시점부터 계산합니다. (오래 걸린 수집 결과도 window 초 동안 공유)
+            entry["finished_at"] = loop.time()
+            # 실패한 결과는 공유하지 않습니다. 그사이 같은 키에 새 작업이 등록되었으면 그 항목은 건드리지 않습니다.
+            if self._failed(task) and entries.get(key) is entry:
+                del entries[key]
+
+        task.add_done_callback(on_done)
+        entries[key] = entry
+        return await asyncio.shield(task)
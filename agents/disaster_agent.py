@@ -1,35 +1,145 @@
-from langchain_core.messages import AIMessage
-from langgraph.prebuilt import create_react_agent
+import asyncio
+import json
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from state import GraphState
 from llm_setup import llm
-from mcp_client import MCPClientManager
+from config import DISASTER_AGENT_MODE
+from mcp_servers.address_parser import extract_region
+from .agent_factory import get_react_agent
+from .tool_utils import call_tool_json
 
-async def disaster_agent_node(state: GraphState, tools) -> GraphState:
-    print("======= [Sub-agent] Disaster Agent 실행 =======")
-    
-    prompt = f"""
+# 파이프라인 모드에서 호출할 도구와 보고서에 표시할 데이터 이름
+DISASTER_SOURCES = {
+    "getDisasterMessage": "긴급 재난 문자",
+    "getForestFires": "산불 정보",
+    "getKMAWeatherWarning": "기상청 기상특보",
+}
+
+DISASTER_SYSTEM_PROMPT = """
     당신은 공공 화재 재난 데이터 분석가 입니다.
     지난 24시간 동안 수집된 화재 재난 관련 데이터를 분석하여 공공 화재 재난 데이터 분석 보고서를 작성해주세요.
-    
+
     수집 및 분석할 데이터의 종류
     1. 긴급 재난 문자 (getDisasterMessage)
     2. 산불 정보 (getForestFires)
     3. 기상청 기상특보 (getKMAWeatherWarning)
     """
-    
-    disaster_agent = create_react_agent(
-        llm,
-        tools=tools,
-        prompt=prompt,
-        state_schema=GraphState,
+
+# 파이프라인 모드에서 위치 기반 조회 결과를 넣었을 때만 덧붙이는 설명
+NEARBY_LABEL = " (사용자 지역)"
+NEARBY_PROMPT = """
+    긴급 재난 문자와 산불 정보가 '(사용자 지역)'으로 표시된 경우, 사용자 주소의 시도/시군구/읍면동에 해당하는 데이터만 수집된 것입니다.
+    (각 항목의 _match.level: sido=시도 전체 대상, sigungu=시군구 대상, dong=읍면동 대상, radius=좌표 반경 내)
+    """
+
+def normalize_safety_payload(source: str, payload) -> dict:
+    """
+    safetydata.go.kr 응답을 {source, status, total_count, items} 형태로 정규화합니다.
+    헤더, 페이지 정보 등 분석에 필요 없는 필드는 제거하고 비어 있는 값은 생략합니다.
+    """
+    if not isinstance(payload, dict):
+        return {"source": source, "status": "error", "message": str(payload), "items": []}
+
+    header = payload.get("header") or {}
+    result_code = header.get("resultCode", payload.get("resultCode"))
+    if result_code not in (None, "00", 0):
+        message = header.get("errorMsg") or header.get("resultMsg") or payload.get("resultMsg")
+        return {"source": source, "status": "error", "message": message, "items": []}
+
+    rows = payload.get("body") or []
+    if isinstance(rows, dict):
+        rows = rows.get("items") or rows.get("item") or [rows]
+    items = [
+        {key: value for key, value in row.items() if value not in (None, "")}
+        for row in rows if isinstance(row, dict)
+    ]
+    return {
+        "source": source,
+        "status": "ok",
+        "total_count": payload.get("totalCount", len(items)),
+        "items": items,
+    }
+
+# 위치 기반 조회 도구가 대신 처리하는 소스 (getNearbyDisasterEvents 결과의 키 -> 도구 이름)
+NEARBY_SOURCES = {"disaster_message": "getDisasterMessage", "forest_fires": "getForestFires"}
+
+async def _fetch_disaster_data(tools, address: str = None) -> list:
+    """
+    공공 재난 데이터 도구를 동시에 호출하고 결과를 정규화합니다.
+    주소에서 시도를 찾을 수 있고 위치 기반 조회 도구가 있으면, 재난 문자와 산불은 사용자 지역 이벤트만 가져옵니다.
+    """
+    tools_by_name = {tool.name: tool for tool in tools}
+    use_nearby = (
+        "getNearbyDisasterEvents" in tools_by_name and bool(address) and extract_region(address)["sido"] is not None
     )
-    
+    skipped = set(NEARBY_SOURCES.values()) if use_nearby else set()
+    names = [name for name in DISASTER_SOURCES if name in tools_by_name and name not in skipped]
+    calls = [call_tool_json(tools_by_name[name]) for name in names]
+    if use_nearby:
+        calls.append(call_tool_json(tools_by_name["getNearbyDisasterEvents"], {"address": address}))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    normalized = []
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            normalized.append({"source": DISASTER_SOURCES[name], "status": "error", "message": str(result), "items": []})
+        else:
+            normalized.append(normalize_safety_payload(DISASTER_SOURCES[name], result))
+
+    if use_nearby:
+        nearby = results[-1]
+        for key, name in NEARBY_SOURCES.items():
+            source = f"{DISASTER_SOURCES[name]}{NEARBY_LABEL}"
+            if isinstance(nearby, Exception):
+                normalized.append({"source": source, "status": "error", "message": str(nearby), "items": []})
+            elif not isinstance(nearby, dict) or "results" not in nearby:
+                normalized.append(normalize_safety_payload(source, nearby))
+            else:
+                normalized.append(normalize_safety_payload(source, nearby["results"].get(key)))
+    return normalized
+
+async def _run_pipeline(state: GraphState, tools) -> str:
+    """도구를 코드에서 병렬 호출한 뒤, 한 번의 LLM 호출로 보고서를 작성합니다."""
+    gps = state.get("GPS")
+    address = gps.get("address") if isinstance(gps, dict) else gps
+    disaster_data = await _fetch_disaster_data(tools, address)
+    print("--- Disaster Agent 수집 데이터 ---")
+    print(disaster_data)
+
+    system_prompt = DISASTER_SYSTEM_PROMPT
+    if any(item["source"].endswith(NEARBY_LABEL) for item in disaster_data):
+        system_prompt += NEARBY_PROMPT
+
+    response = await llm.ainvoke([
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=(
+            "다음은 방금 수집한 공공 재난 데이터입니다. 이 데이터만을 근거로 보고서를 작성하세요.\n"
+            + json.dumps(disaster_data, ensure_ascii=False)
+        )),
+    ])
+    return response.content
+
+def _disaster_prompt(state: GraphState) -> str:
+    return DISASTER_SYSTEM_PROMPT
+
+async def _run_react_agent(state: GraphState, tools) -> str:
+    """LLM이 직접 도구를 호출하는 ReAct 에이전트로 보고서를 작성합니다."""
+    disaster_agent = get_react_agent("disaster", tools, _disaster_prompt)
+
     agent_response = await disaster_agent.ainvoke(state)
-    disaster_content = agent_response["messages"][-1].content
-    disaster_message = AIMessage(content=disaster_content, name="DisasterAgent")
-    
+
     print("--- Disaster Agent 세부 분석 과정 ---")
     print(agent_response)
-    
+    return agent_response["messages"][-1].content
+
+async def disaster_agent_node(state: GraphState, tools) -> GraphState:
+    print("======= [Sub-agent] Disaster Agent 실행 =======")
+
+    if DISASTER_AGENT_MODE == "pipeline":
+        disaster_content = await _run_pipeline(state, tools)
+    else:
+        disaster_content = await _run_react_agent(state, tools)
+    disaster_message = AIMessage(content=disaster_content, name="DisasterAgent")
+
     print("--- Disaster Agent 분석 완료 ---")
     return {"messages": [disaster_message], "disaster": disaster_content}
\ No newline at end of file
@@ -1,37 +1,154 @@
-from langchain_core.messages import AIMessage
-from langgraph.prebuilt import create_react_agent
+import asyncio
+import json
+import re
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from state import GraphState
 from llm_setup import llm
-from mcp_client import MCPClientManager
+from config import (
+    NEWS_AGENT_MODE, NEWS_NAVER_DISPLAY, NEWS_SCRAPE_TOP_N, NEWS_SCRAPE_CONCURRENCY, NEWS_PROMPT_MAX_CLUSTERS,
+)
+from .agent_factory import get_react_agent
+from .tool_utils import call_tool_json
+from .disaster_agent import normalize_safety_payload
+from .news_dedup import cluster_news, outlet_of
 
-async def new_agent_node(state: GraphState, tools) -> GraphState:
-    print("======= [Sub-agent] News Agent 실행 =======")
-    
-    prompt = f"""
+NEWS_QUERY = "화재"
+
+def _strip_tags(text: str) -> str:
+    """네이버 검색 결과의 <b> 태그와 HTML 엔티티를 제거합니다."""
+    text = re.sub(r"<[^>]+>", "", text or "")
+    return text.replace("&quot;", '"').replace("&amp;", "&").replace("&lt;", "<").replace("&gt;", ">")
+
+async def _scrape_articles(scrape_tool, urls: list) -> list:
+    """기사 URL들을 제한된 동시성으로 스크랩합니다."""
+    semaphore = asyncio.Semaphore(NEWS_SCRAPE_CONCURRENCY)
+
+    async def scrape_one(url):
+        async with semaphore:
+            try:
+                return await call_tool_json(scrape_tool, {"url": url})
+            except Exception as e:
+                return {"status": "error", "url": url, "message": str(e)}
+
+    return await asyncio.gather(*(scrape_one(url) for url in urls))
+
+async def _collect_news(tools) -> dict:
+    """네이버/연합 뉴스를 동시에 조회하고, 네이버 상위 기사 본문을 병렬로 스크랩합니다."""
+    tools_by_name = {tool.name: tool for tool in tools}
+
+    async def safe_call(name, arguments=None):
+        if name not in tools_by_name:
+            return {"status": "error", "message": f"'{name}' 도구를 사용할 수 없습니다."}
+        try:
+            return await call_tool_json(tools_by_name[name], arguments)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    naver_result, yonhap_result = await asyncio.gather(
+        safe_call("get_naver_news", {"query": NEWS_QUERY, "display": NEWS_NAVER_DISPLAY, "sort": "date"}),
+        safe_call("get_yonhap_news"),
+    )
+
+    items = []
+    if isinstance(naver_result, dict):
+        for item in naver_result.get("items", []):
+            items.append({
+                "source": "naver",
+                "title": _strip_tags(item.get("title")),
+                "description": _strip_tags(item.get("description")),
+                "link": item.get("link") or item.get("originallink"),
+                "outlet": outlet_of(item.get("originallink") or item.get("link")),
+                "pubDate": item.get("pubDate"),
+            })
+    yonhap = normalize_safety_payload("yonhap_news", yonhap_result)
+    for row in yonhap["items"]:
+        items.append({
+            "source": "yonhap",
+            "title": row.get("YNA_TTL") or row.get("title", ""),
+            "description": row.get("YNA_CN") or row.get("description", ""),
+            "outlet": "yna.co.kr",
+            "pubDate": row.get("YNA_YMD") or row.get("CRT_DT"),
+        })
+
+    # 여러 언론사가 같은 기사를 재송고한 경우 대표 기사 하나만 남기고, 스크랩도 대표 기사에만 수행합니다.
+    # (MinHash 계산은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행합니다)
+    clusters = await asyncio.to_thread(cluster_news, items)
+    print(f"--- News Agent: 기사 {len(items)}건 → 클러스터 {len(clusters)}개 ---")
+
+    articles = []
+    urls = [cluster["link"] for cluster in clusters if cluster.get("link")][:NEWS_SCRAPE_TOP_N]
+    if urls and "scrape_batch" in tools_by_name:
+        # 서버에서 기사 저장소를 확인한 뒤 저장되지 않은 기사만 동시에 스크랩합니다.
+        batch = await safe_call("scrape_batch", {"urls": urls})
+        articles = batch.get("results", [batch]) if isinstance(batch, dict) else batch
+    elif urls and "scrape" in tools_by_name:
+        articles = await _scrape_articles(tools_by_name["scrape"], urls)
+
+    # 요약 프롬프트에는 보도 건수가 많은 상위 클러스터만 넣습니다.
+    news_data = {
+        "news_clusters": clusters[:NEWS_PROMPT_MAX_CLUSTERS],
+        "total_clusters": len(clusters),
+        "naver_articles": articles,
+    }
+    # 조회 실패는 보고서에 원인이 드러나도록 그대로 전달합니다.
+    if not isinstance(naver_result, dict) or naver_result.get("status") == "error":
+        news_data["naver_error"] = naver_result
+    if isinstance(yonhap_result, dict) and yonhap_result.get("status") == "error":
+        news_data["yonhap_error"] = yonhap_result
+    elif yonhap["status"] == "error":
+        news_data["yonhap_error"] = yonhap
+    return news_data
+
+def _news_system_prompt(state: GraphState) -> str:
+    return f"""
     당신은 화재 뉴스 데이터 분석가로서 국내 주요 언론사의 화재 재난 관련 최신 뉴스를 실시간으로 수집하고 분석합니다.
     사용자의 현재 위치: {state["GPS"]}
     사용자의 현재 위치를 기반으로 지난 24시간 동안 수집된 화재 재난 뉴스 데이터를 분석하여 화재 뉴스 분석 보고서를 작성해주세요.
-    
+    """
+
+async def _run_pipeline(state: GraphState, tools) -> str:
+    """뉴스 수집을 코드에서 병렬로 수행한 뒤, 한 번의 LLM 호출로 보고서를 작성합니다."""
+    news_data = await _collect_news(tools)
+    print("--- News Agent 수집 데이터 ---")
+    print(news_data)
+
+    response = await llm.ainvoke([
+        SystemMessage(content=_news_system_prompt(state)),
+        HumanMessage(content=(
+            "다음은 방금 수집한 네이버/연합 뉴스를 중복 기사끼리 묶은 클러스터(report_count: 보도 건수, sources: 출처별 건수, outlets: 보도 언론사)와 상위 기사 본문입니다. "
+            "보도 건수가 많을수록 널리 보도된 사건입니다. 이 데이터만을 근거로 보고서를 작성하세요.\n"
+            + json.dumps(news_data, ensure_ascii=False)
+        )),
+    ])
+    return response.content
+
+def _news_react_prompt(state: GraphState) -> str:
+    return _news_system_prompt(state) + """
     ## 뉴스데이터 수집 및 분석 지시사항
     1. 'get_naver_news' tool을 사용하여 한국의 화재 관련 네이버 뉴스를 2건 검색하세요.
-    2. 검색 결과에서 나온 네이버 뉴스 2건의 URL(link)들을 'scrape' tool을 사용하여 전체 기사 내용을 추출하세요.
+    2. 검색 결과에서 나온 네이버 뉴스 2건의 URL(link)들을 'scrape_batch' tool에 한 번에 전달하여 전체 기사 내용을 추출하세요.
     3. 'get_yonhap_news' tool을 사용하여 한국의 화재 관련 연합 뉴스를 5건 검색하세요.
     4. 수집한 뉴스 기사들을 기반으로 분석하세요.
     """
-    
-    news_agent = create_react_agent(
-        llm,
-        tools=tools,
-        prompt=prompt,
-        state_schema=GraphState,
-    )
-    
+
+async def _run_react_agent(state: GraphState, tools) -> str:
+    """LLM이 직접 도구를 호출하는 ReAct 에이전트로 보고서를 작성합니다."""
+    news_agent = get_react_agent("news", tools, _news_react_prompt)
+
     agent_response = await news_agent.ainvoke(state)
-    news_content = agent_response["messages"][-1].content
-    news_message = AIMessage(content=news_content, name="NewsAgent")
-    
+
     print("--- News Agent 세부 분석 과정 ---")
     print(agent_response)
-    
+    return agent_response["messages"][-1].content
+
+async def new_agent_node(state: GraphState, tools) -> GraphState:
+    print("======= [Sub-agent] News Agent 실행 =======")
+
+    if NEWS_AGENT_MODE == "pipeline":
+        news_content = await _run_pipeline(state, tools)
+    else:
+        news_content = await _run_react_agent(state, tools)
+    news_message = AIMessage(content=news_content, name="NewsAgent")
+
     print("--- News Agent 분석 완료 ---")
     return {"messages": [news_message], "news": news_content}
\ No newline at end of file
@@ -0,0 +1,130 @@
+import re
+import hashlib
+from urllib.parse import urlsplit
+from config import NEWS_DEDUP_THRESHOLD, NEWS_DEDUP_NUM_PERM, NEWS_DEDUP_BANDS
+
+SHINGLE_SIZE = 3             # 문자 n-gram 크기 (한국어는 띄어쓰기가 달라도 잡히도록 문자 단위로 자릅니다)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def _permutations(num_perm: int) -> list:
+    """MinHash에 사용할 (a, b) 해시 계수를 고정 시드로 만듭니다."""
+    params = []
+    for i in range(num_perm):
+        digest = hashlib.blake2b(f"minhash-{i}".encode("utf-8"), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+_PERMUTATIONS = _permutations(NEWS_DEDUP_NUM_PERM)
+
+def _normalize_text(text: str) -> str:
+    """태그, 공백, 문장부호를 제거해 언론사별 표기 차이를 줄입니다."""
+    text = re.sub(r"<[^>]+>|&[a-z]+;", "", text or "")
+    return re.sub(r"[\W_]+", "", text.lower())
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    normalized = _normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def minhash_signature(shingle_set: set) -> list:
+    """문자 n-gram 집합의 MinHash 시그니처를 계산합니다."""
+    if not shingle_set:
+        return [_MAX_HASH] * len(_PERMUTATIONS)
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big")
+        for s in shingle_set
+    ]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+def estimate_similarity(sig_a: list, sig_b: list) -> float:
+    """두 시그니처로 자카드 유사도를 추정합니다."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+def lsh_bands(num_perm: int, threshold: float, bands: int = 0) -> int:
+    """
+    LSH 밴드 수를 정합니다. (밴드 수 x 밴드당 행 수 = 시그니처 길이)
+    bands가 0이면 후보가 되는 유사도 경계 (1/b)^(1/r)가 threshold에 가장 가까운 값을 고릅니다.
+    """
+    if bands > 0:
+        if num_perm % bands != 0:
+            raise ValueError(f"NEWS_DEDUP_BANDS({bands})가 NEWS_DEDUP_NUM_PERM({num_perm})을 나누어떨어지게 해야 합니다.")
+        return bands
+    divisors = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(divisors, key=lambda b: abs((1 / b) ** (b / num_perm) - threshold))
+
+def candidate_pairs(signatures: list, bands: int) -> set:
+    """시그니처를 밴드로 나눠, 어느 한 밴드라도 완전히 같은 기사 쌍만 비교 후보로 반환합니다."""
+    rows = len(signatures[0]) // bands if signatures else 0
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        for index, signature in enumerate(signatures):
+            buckets.setdefault(tuple(signature[band * rows:(band + 1) * rows]), []).append(index)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    pairs.add((i, j))
+    return pairs
+
+def outlet_of(link: str) -> str:
+    """기사 링크에서 언론사 도메인을 추출합니다."""
+    host = urlsplit(link or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def cluster_news(items: list, threshold: float = NEWS_DEDUP_THRESHOLD, bands: int = NEWS_DEDUP_BANDS) -> list:
+    """
+    제목+본문(요약)이 거의 같은 기사들을 하나의 클러스터로 묶습니다.
+    모든 쌍을 비교하지 않고, MinHash LSH 밴드가 겹치는 후보 쌍만 유사도를 확인합니다.
+    items: [{"source", "title", "description", "link", "outlet", ...}]
+    반환: 클러스터별 대표 기사에 report_count(보도 건수), sources(출처별 건수), outlets(언론사 목록)를 붙인 리스트.
+          보도 건수가 많은 클러스터가 앞에 옵니다.
+    """
+    signatures = [
+        minhash_signature(shingles(f"{item.get('title', '')} {item.get('description', '')}"))
+        for item in items
+    ]
+
+    # 유니온-파인드로 유사도가 기준 이상인 기사들을 연결합니다.
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(signatures, lsh_bands(len(_PERMUTATIONS), threshold, bands)):
+        if estimate_similarity(signatures[i], signatures[j]) >= threshold:
+            parent[find(j)] = find(i)
+
+    groups = {}
+    for index in range(len(items)):
+        groups.setdefault(find(index), []).append(items[index])
+
+    clusters = []
+    for members in groups.values():
+        # 본문을 스크랩할 수 있도록 링크가 있는 기사, 그중 내용이 가장 긴 기사를 대표로 고릅니다.
+        representative = max(
+            members,
+            key=lambda item: (bool(item.get("link")), len(item.get("description") or "")),
+        )
+        sources = {}
+        for member in members:
+            sources[member["source"]] = sources.get(member["source"], 0) + 1
+        outlets = sorted({member["outlet"] for member in members if member.get("outlet")})
+        clusters.append({
+            **representative,
+            "report_count": len(members),
+            "sources": sources,
+            "outlets": outlets,
+        })
+
+    clusters.sort(key=lambda cluster: cluster["report_count"], reverse=True)
+    return clusters
@@ -1,13 +1,274 @@
-from langchain_core.messages import AIMessage
-from langgraph.prebuilt import create_react_agent
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from state import GraphState
 from llm_setup import llm
-from mcp_client import MCPClientManager
+from config import SNS_AGENT_MODE, SNS_VIDEOS_PER_QUERY, SNS_MAX_DEEP_VIDEOS, SNS_CROSS_TIME_WINDOW_HOURS
+from mcp_servers.address_parser import extract_region, match_region_keywords, base_dong
+from .agent_factory import get_react_agent
+from .tool_utils import call_tool_json
 
-async def sns_agent_node(state: GraphState, tools) -> GraphState:
-    print("======= [Sub-agent] SNS Agent 실행 =======")
-    
-    prompt = f""" 
+# 화재 징후로 판단할 키워드
+FIRE_KEYWORDS = ("화재", "불길", "불이", "불났", "연기", "소방", "산불", "폭발", "진화", "대피")
+# 보고서 작성 LLM에 넘길 대본 발췌 길이
+TRANSCRIPT_EXCERPT_CHARS = 1500
+
+SNS_REPORT_FORMAT = """
+        ---
+        ## SNS 화재 분석 보고서
+
+        ### 1. 종합 요약
+        (YouTube와 Threads 분석 결과를 바탕으로 사용자 위치 근처의 화재 발생 가능성에 대한 최종 요약)
+
+        ### 2. 신뢰도 평가
+        (높음/중간/낮음 중 택일 및 그 이유)
+
+        ### 3. 세부 분석: YouTube
+        - **검색 키워드:** (예: "서대문구 화재", "대현동 화재")
+        - **관련 영상 요약:** (분석한 영상의 제목, 게시 시간, 주요 내용 요약)
+        - **주요 정보:** (영상 대본이나 댓글에서 발견된 구체적인 화재 징후)
+
+        ### 4. 세부 분석: Threads
+        - **주요 게시물 요약:** (수집된 게시물 중 사용자 위치와 관련 있을 수 있는 내용)
+        - **주요 정보:** (게시물이나 댓글에서 발견된 구체적인 위치 또는 상황 묘사)
+        ---
+"""
+
+# --- 파이프라인 모드: 수집 ---
+
+def _parse_time(value):
+    """YouTube("...Z")와 Threads("...+0000") 형식의 시각을 UTC datetime으로 변환합니다."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def _matches(text: str, keywords) -> list:
+    return [keyword for keyword in keywords if keyword in text]
+
+async def _safe_call(tools_by_name, name, arguments=None):
+    if name not in tools_by_name:
+        return {"error": f"'{name}' 도구를 사용할 수 없습니다."}
+    try:
+        return await call_tool_json(tools_by_name[name], arguments)
+    except Exception as e:
+        return {"error": str(e)}
+
+async def _search_videos(tools_by_name, queries: list) -> list:
+    """검색어별 YouTube 검색을 동시에 실행하고, 중복을 제거한 영상 목록을 반환합니다."""
+    results = await asyncio.gather(*(
+        _safe_call(tools_by_name, "searchVideos", {"query": query, "max_results": SNS_VIDEOS_PER_QUERY, "order": "date"})
+        for query in queries
+    ))
+
+    videos = {}
+    for query, result in zip(queries, results):
+        if not isinstance(result, dict):
+            continue
+        for item in result.get("items", []):
+            video_id = (item.get("id") or {}).get("videoId")
+            if not video_id:
+                continue
+            snippet = item.get("snippet") or {}
+            video = videos.setdefault(video_id, {
+                "videoId": video_id,
+                "title": snippet.get("title", ""),
+                "description": snippet.get("description", ""),
+                "channelTitle": snippet.get("channelTitle"),
+                "publishedAt": snippet.get("publishedAt"),
+                "queries": [],
+            })
+            video["queries"].append(query)
+    return list(videos.values())
+
+def _select_videos(videos: list, region: dict) -> list:
+    """제목/설명의 지역·화재 키워드 일치 수와 최신성으로 심층 분석할 영상을 고릅니다."""
+    def relevance(video):
+        text = f"{video['title']} {video['description']}"
+        published = _parse_time(video["publishedAt"]) or datetime.min.replace(tzinfo=timezone.utc)
+        return (len(match_region_keywords(text, region)), len(_matches(text, FIRE_KEYWORDS)), published)
+
+    return sorted(videos, key=relevance, reverse=True)[:SNS_MAX_DEEP_VIDEOS]
+
+async def _enrich_videos(tools_by_name, videos: list) -> None:
+    """선택한 영상의 세부 정보, 대본, 댓글을 동시에 수집해 영상 정보에 추가합니다."""
+    if not videos:
+        return
+    video_ids = [video["videoId"] for video in videos]
+
+    if "getVideoBundles" in tools_by_name:
+        # 배치 도구 한 번으로 모든 영상의 세부 정보, 댓글, 자막을 가져옵니다.
+        result = await _safe_call(tools_by_name, "getVideoBundles", {
+            "video_ids": video_ids, "max_comments": 10, "transcript_max_chars": TRANSCRIPT_EXCERPT_CHARS,
+        })
+        bundles = {bundle["videoId"]: bundle for bundle in result.get("videos", [])} if isinstance(result, dict) else {}
+        for video in videos:
+            bundle = bundles.get(video["videoId"], {})
+            if bundle.get("description"):
+                video["description"] = bundle["description"]
+            video["viewCount"] = (bundle.get("statistics") or {}).get("viewCount")
+            video["transcript"] = bundle.get("transcript", "")
+            video["comments"] = bundle.get("comments", [])
+        return
+
+    details, *per_video = await asyncio.gather(
+        _safe_call(tools_by_name, "getVideoDetails", {"video_ids": video_ids}),
+        *(_safe_call(tools_by_name, "getTranscripts", {"video_id": video_id}) for video_id in video_ids),
+        *(_safe_call(tools_by_name, "getVideoComments", {"video_id": video_id, "max_results": 10}) for video_id in video_ids),
+    )
+    transcripts = per_video[:len(video_ids)]
+    comments = per_video[len(video_ids):]
+
+    details_by_id = {}
+    if isinstance(details, dict):
+        details_by_id = {item.get("id"): item for item in details.get("items", [])}
+
+    for video, transcript, comment_result in zip(videos, transcripts, comments):
+        detail = details_by_id.get(video["videoId"], {})
+        snippet = detail.get("snippet") or {}
+        if snippet.get("description"):
+            video["description"] = snippet["description"]
+        video["viewCount"] = (detail.get("statistics") or {}).get("viewCount")
+        video["transcript"] = (transcript.get("transcript") or "") if isinstance(transcript, dict) else ""
+        video["comments"] = [
+            ((item.get("snippet") or {}).get("topLevelComment") or {}).get("snippet", {}).get("textDisplay", "")
+            for item in (comment_result.get("items", []) if isinstance(comment_result, dict) else [])
+        ]
+
+async def _fetch_threads(tools_by_name) -> list:
+    """지난 24시간 동안의 '화재' 태그 Threads 게시물을 댓글과 함께 가져옵니다."""
+    now = datetime.now(timezone.utc)
+    result = await _safe_call(tools_by_name, "get_fire_related_threads_with_replies", {
+        "start_date": (now - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "end_date": now.strftime("%Y-%m-%d"),
+        "max_results": 5,
+    })
+    return result if isinstance(result, list) else []
+
+# --- 파이프라인 모드: 교차 검증 ---
+
+def _video_evidence(video: dict, region: dict, now: datetime) -> dict:
+    text = " ".join([video["title"], video["description"], video.get("transcript", ""), *video.get("comments", [])])
+    published = _parse_time(video["publishedAt"])
+    evidence = {
+        "videoId": video["videoId"],
+        "title": video["title"],
+        "channelTitle": video.get("channelTitle"),
+        "publishedAt": video["publishedAt"],
+        "viewCount": video.get("viewCount"),
+        "search_queries": video["queries"],
+        "location_hits": match_region_keywords(text, region),
+        "fire_hits": _matches(text, FIRE_KEYWORDS),
+        "recent": bool(published and now - published <= timedelta(days=1)),
+        "description": video["description"],
+        "transcript_excerpt": video.get("transcript", "")[:TRANSCRIPT_EXCERPT_CHARS],
+        "comments": video.get("comments", []),
+    }
+    evidence["concrete"] = bool(evidence["location_hits"] and evidence["fire_hits"] and evidence["recent"])
+    return evidence
+
+def _thread_evidence(thread: dict, region: dict, now: datetime) -> dict:
+    replies = [reply.get("text", "") for reply in thread.get("replies", []) if isinstance(reply, dict)]
+    text = " ".join([thread.get("text") or "", *replies])
+    posted = _parse_time(thread.get("timestamp"))
+    evidence = {
+        "id": thread.get("id"),
+        "permalink": thread.get("permalink"),
+        "timestamp": thread.get("timestamp"),
+        "text": thread.get("text"),
+        "replies": replies,
+        "location_hits": match_region_keywords(text, region),
+        "recent": bool(posted and now - posted <= timedelta(days=1)),
+    }
+    # '화재' 태그로 검색된 게시물이므로 위치와 시간이 확인되면 구체적인 징후로 봅니다.
+    evidence["concrete"] = bool(evidence["location_hits"] and evidence["recent"])
+    return evidence
+
+def assess_reliability(video_evidence: list, thread_evidence: list) -> dict:
+    """
+    YouTube와 Threads 근거의 위치/시간 일치 여부로 신뢰도를 결정합니다.
+    - 높음: 같은 지역을 언급하는 YouTube 영상과 Threads 게시물이 SNS_CROSS_TIME_WINDOW_HOURS 이내에 모두 존재
+    - 중간: 한쪽 플랫폼에서만 위치와 시간이 확인된 화재 징후가 존재
+    - 낮음: 그 외 (위치 불명확한 언급, 관련 없는 과거 영상 등)
+    """
+    window = timedelta(hours=SNS_CROSS_TIME_WINDOW_HOURS)
+    concrete_videos = [v for v in video_evidence if v["concrete"]]
+    concrete_threads = [t for t in thread_evidence if t["concrete"]]
+
+    cross_matches = []
+    for video in concrete_videos:
+        for thread in concrete_threads:
+            shared = sorted(set(video["location_hits"]) & set(thread["location_hits"]))
+            video_time, thread_time = _parse_time(video["publishedAt"]), _parse_time(thread["timestamp"])
+            if shared and video_time and thread_time and abs(video_time - thread_time) <= window:
+                cross_matches.append({"videoId": video["videoId"], "threadId": thread["id"], "shared_locations": shared})
+
+    if cross_matches:
+        rating = "높음"
+        reason = "YouTube 영상과 Threads 게시물이 같은 지역을 비슷한 시간대에 언급하여 교차 검증되었습니다."
+    elif concrete_videos or concrete_threads:
+        rating = "중간"
+        platform = "YouTube" if concrete_videos else "Threads"
+        reason = f"{platform}에서만 위치와 시간이 확인된 화재 징후가 발견되었고, 다른 플랫폼에서는 교차 확인되지 않았습니다."
+    else:
+        rating = "낮음"
+        reason = "위치와 시간이 함께 확인된 화재 징후가 없습니다."
+    return {"rating": rating, "reason": reason, "cross_matches": cross_matches}
+
+async def collect_sns_evidence(state: GraphState, tools) -> dict:
+    """SNS 데이터를 병렬로 수집하고 결정적인 규칙으로 교차 검증한 결과를 반환합니다."""
+    tools_by_name = {tool.name: tool for tool in tools}
+    region = extract_region(state.get("GPS"))
+    queries = [f"{name} 화재" for name in (region["gu"], base_dong(region["dong"])) if name] or ["화재"]
+
+    videos, threads = await asyncio.gather(
+        _search_videos(tools_by_name, queries),
+        _fetch_threads(tools_by_name),
+    )
+    selected = _select_videos(videos, region)
+    await _enrich_videos(tools_by_name, selected)
+
+    now = datetime.now(timezone.utc)
+    video_evidence = [_video_evidence(video, region, now) for video in selected]
+    thread_evidence = [_thread_evidence(thread, region, now) for thread in threads]
+    return {
+        "region": region,
+        "search_queries": queries,
+        "youtube": video_evidence,
+        "threads": thread_evidence,
+        "reliability": assess_reliability(video_evidence, thread_evidence),
+    }
+
+async def _run_pipeline(state: GraphState, tools) -> str:
+    """수집과 신뢰도 평가는 코드로 수행하고, 보고서 작성만 LLM에 맡깁니다."""
+    evidence = await collect_sns_evidence(state, tools)
+    print("--- SNS Agent 교차 검증 결과 ---")
+    print(evidence["reliability"])
+
+    system_prompt = f"""
+        당신은 고도로 숙련된 SNS 데이터 분석가입니다.
+        사용자의 위치({state["GPS"]}) 근처의 화재 징후에 대해, 이미 수집되고 교차 검증된 YouTube/Threads 데이터를 바탕으로 "SNS 화재 분석 보고서"를 작성합니다.
+        SNS의 정보는 확인되지 않은 소문, 과장, 또는 과거의 사건일 수 있으므로 회의적인 관점을 유지하세요.
+        신뢰도 평가는 주어진 reliability.rating 값을 그대로 사용하고, reliability.reason과 근거 데이터를 바탕으로 이유를 설명하세요.
+        아래 형식에 맞춰 보고서를 작성하세요.
+        {SNS_REPORT_FORMAT}
+    """
+    response = await llm.ainvoke([
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=json.dumps(evidence, ensure_ascii=False)),
+    ])
+    return response.content
+
+# --- ReAct 모드 ---
+
+def _sns_react_prompt(state: GraphState) -> str:
+    return f"""
         ## 역할 (Role)
         당신은 고도로 숙련된 SNS 데이터 분석가입니다. 당신의 임무는 여러 소셜 미디어 플랫폼(YouTube, Threads)에서 수집된 정보를 교차 검증하여, 사용자의 현재 위치 근처에서 발생했을 수 있는 화재 징후를 파악하는 것입니다.
 
@@ -26,7 +287,7 @@ async def sns_agent_node(state: GraphState, tools) -> GraphState:
 
         **2단계: 관련 영상 심층 분석 (YouTube)**
         1.  1단계에서 검색된 영상 중, 제목이나 설명이 현재 화재와 **관련성이 가장 높아 보이는 영상 1~2개**를 선별합니다.
-        2.  선별된 각 영상에 대해 `getVideoDetails`, `getTranscripts`, `getVideoComments` 도구를 모두 사용하여 다음 정보를 추출합니다.
+        2.  선별된 영상들의 ID를 `getVideoBundles` 도구에 한 번에 전달하여 세부 정보, 대본, 댓글을 함께 수집하고 다음 정보를 추출합니다. (`getVideoDetails`, `getTranscripts`, `getVideoComments`를 개별로 호출할 필요가 없습니다.)
             * 영상의 실제 내용 (대본, 댓글)이 검색어와 일치하는가?
             * 영상이 언제, 어디서 촬영된 것인가?
             * 현장 반응은 어떠한가?
@@ -44,40 +305,27 @@ async def sns_agent_node(state: GraphState, tools) -> GraphState:
 
         **5단계: 최종 보고서 생성**
         수집된 모든 정보와 신뢰도 평가를 바탕으로, 아래 형식에 맞춰 "SNS 화재 분석 보고서"를 작성하여 최종 응답으로 반환하세요.
+        {SNS_REPORT_FORMAT}
+    """
 
-        ---
-        ## SNS 화재 분석 보고서
+async def _run_react_agent(state: GraphState, tools) -> str:
+    """LLM이 4단계 절차에 따라 직접 도구를 호출하는 ReAct 에이전트로 보고서를 작성합니다."""
+    sns_agent = get_react_agent("sns", tools, _sns_react_prompt)
 
-        ### 1. 종합 요약
-        (YouTube와 Threads 분석 결과를 바탕으로 사용자 위치 근처의 화재 발생 가능성에 대한 최종 요약)
+    agent_response = await sns_agent.ainvoke(state)
 
-        ### 2. 신뢰도 평가
-        (높음/중간/낮음 중 택일 및 그 이유)
+    print("--- SNS Agent 세부 분석 과정 ---")
+    print(agent_response)
+    return agent_response["messages"][-1].content
 
-        ### 3. 세부 분석: YouTube
-        - **검색 키워드:** (예: "서대문구 화재", "대현동 화재")
-        - **관련 영상 요약:** (분석한 영상의 제목, 게시 시간, 주요 내용 요약)
-        - **주요 정보:** (영상 대본이나 댓글에서 발견된 구체적인 화재 징후)
+async def sns_agent_node(state: GraphState, tools) -> GraphState:
+    print("======= [Sub-agent] SNS Agent 실행 =======")
 
-        ### 4. 세부 분석: Threads
-        - **주요 게시물 요약:** (수집된 게시물 중 사용자 위치와 관련 있을 수 있는 내용)
-        - **주요 정보:** (게시물이나 댓글에서 발견된 구체적인 위치 또는 상황 묘사)
-        ---
-    """
-    
-    sns_agent = create_react_agent(
-        llm,
-        tools=tools,
-        prompt=prompt,
-        state_schema=GraphState,
-    )
-    
-    agent_response = await sns_agent.ainvoke(state)
-    sns_content = agent_response["messages"][-1].content
+    if SNS_AGENT_MODE == "pipeline":
+        sns_content = await _run_pipeline(state, tools)
+    else:
+        sns_content = await _run_react_agent(state, tools)
     sns_message = AIMessage(content=sns_content, name="SNSAgent")
-    
-    print("--- SNS Agent 세부 분석 과정 ---")
-    print(agent_response)
-    
+
     print("--- SNS Agent 분석 완료 ---")
     return {"messages": [sns_message], "SNS": sns_content}
\ No newline at end of file
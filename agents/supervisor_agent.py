@@ -1,9 +1,16 @@
 import asyncio
-from pydantic import BaseModel, Field
-from langgraph.prebuilt import create_react_agent
+import hashlib
+from pydantic import BaseModel, Field, ValidationError
 from state import GraphState
-from llm_setup import llm
-from mcp_client import MCPClientManager
+from config import (
+    GPS_RESOLUTION_MODE, REQUEST_COALESCING_WINDOW_SEC, NEWS_AGENT_MODE, SNS_AGENT_MODE, DISASTER_AGENT_MODE,
+)
+from tool_registry import ToolRegistry
+from mcp_servers.address_parser import extract_region
+from mcp_servers.location_store import DEFAULT_USER_ID
+from .agent_factory import get_react_agent
+from .coalescer import RequestCoalescer
+from .tool_utils import call_tool_json
 from .news_agent import new_agent_node
 from .sns_agent import sns_agent_node
 from .disaster_agent import disaster_agent_node
@@ -11,42 +18,129 @@ from .disaster_agent import disaster_agent_node
 class GPSResponse(BaseModel):
     address: str = Field(..., description="사용자의 현재 위치 주소")
 
+# 같은 지역의 동시 요청에 대한 하위 에이전트 수집 결과를 공유합니다.
+# 일부 에이전트가 실패한 결과(예외가 섞인 결과 목록)는 공유하지 않습니다.
+_coalescer = RequestCoalescer(
+    REQUEST_COALESCING_WINDOW_SEC,
+    is_shareable=lambda results: not any(isinstance(result, Exception) for result in results),
+)
+
+# GPS 서버가 주소 대신 돌려주는 실패 메시지
+GPS_FAILURE_PREFIXES = ("API 요청 실패", "주소 정보를 찾을 수 없습니다")
+
+class GPSUnavailable(Exception):
+    """GPS 도구가 정상 형식으로 실패를 알린 경우 (저장된 위치 없음, 만료, 주소 변환 실패 등)"""
+
+async def _resolve_gps_direct(gps_tool, user_id: str) -> GPSResponse | None:
+    """
+    LLM 없이 get_latest_location 도구를 직접 호출해 GPSResponse로 검증합니다.
+    결과가 잘못된 형식이면 None을 반환하고, 도구가 실패를 알리면 GPSUnavailable을 발생시킵니다.
+    """
+    try:
+        result = await call_tool_json(gps_tool[0], {"user_id": user_id})
+    except Exception as e:
+        print(f"⚠️ GPS 도구 직접 호출 실패: {e}")
+        return None
+
+    if isinstance(result, dict) and result.get("success") is False:
+        raise GPSUnavailable(result.get("message") or "위치 정보를 가져오지 못했습니다.")
+    if not isinstance(result, dict):
+        print(f"⚠️ GPS 도구 결과 형식 오류: {result}")
+        return None
+    try:
+        gps_response = GPSResponse.model_validate(result)
+    except ValidationError as e:
+        print(f"⚠️ GPS 도구 결과 검증 실패: {e}")
+        return None
+    if not gps_response.address.strip():
+        print(f"⚠️ GPS 도구 결과에 주소가 없습니다: {result}")
+        return None
+    if gps_response.address.startswith(GPS_FAILURE_PREFIXES):
+        raise GPSUnavailable(gps_response.address)
+    return gps_response
+
+def _gps_prompt(state: GraphState) -> str:
+    user_id = state.get("user_id") or DEFAULT_USER_ID
+    return f"get_latest_location 도구를 user_id='{user_id}'로 호출해 사용자의 현재 GPS 기반 주소를 찾아주세요."
+
+async def _resolve_gps_with_agent(state: GraphState, gps_tool) -> GPSResponse:
+    """ReAct 에이전트가 get_latest_location 도구를 호출해 주소를 찾습니다."""
+    gps_agent = get_react_agent("gps", gps_tool, _gps_prompt, response_format=GPSResponse)
+    gps_response = await gps_agent.ainvoke(state)
+    return gps_response["structured_response"]
+
+def _shared_request(state: GraphState, gps_data: dict) -> tuple:
+    """
+    하위 에이전트에 넘길 상태와 요청 병합 키를 만듭니다.
+    병합된 실행 결과는 같은 키의 다른 사용자에게도 그대로 전달되므로,
+    - 하위 에이전트에는 지역 단위 주소(시도/시군구/읍면동)만 넘기고 (번지 등 사용자별 상세 주소 제외)
+    - 키는 하위 에이전트가 읽는 값 전체(지역, GPS 오류, 에이전트 모드)로 만듭니다.
+    ReAct 모드 에이전트는 대화 내용도 읽으므로, 이 경우 대화 내용이 같은 요청끼리만 병합됩니다.
+    """
+    region = extract_region(gps_data["address"])
+    region_address = " ".join(part for part in (region["sido"], region["sigungu"], region["dong"]) if part)
+    shared_gps = {**gps_data, "address": region_address or gps_data["address"]}
+    shared_state = {**state, "GPS": shared_gps}
+
+    modes = (NEWS_AGENT_MODE, SNS_AGENT_MODE, DISASTER_AGENT_MODE)
+    key = f"{shared_gps['address']}|{shared_gps.get('error') or ''}|{'/'.join(modes)}"
+    if any(mode != "pipeline" for mode in modes):
+        conversation = "\n".join(str(message.content) for message in state.get("messages", []))
+        key += "|" + hashlib.sha256(conversation.encode("utf-8")).hexdigest()[:16]
+    return key, shared_state
+
+async def _run_sub_agents(current_state: GraphState, news_tools, sns_tools, disaster_tools) -> list:
+    """News, SNS, Disaster 에이전트를 병렬로 실행합니다."""
+    return await asyncio.gather(
+        new_agent_node(current_state, news_tools),
+        sns_agent_node(current_state, sns_tools),
+        disaster_agent_node(current_state, disaster_tools),
+        return_exceptions=True
+    )
+
 async def supervisor_node(state: GraphState) -> GraphState:
     print("\n======= [Node] Supervisor 실행 시작 =======")
     
-    mcp_client = await MCPClientManager.get_client()
-    
     # 1. GPS 정보 수집
     print("--- 1. GPS 정보 수집 시작 ---")
 
-    all_tools = await mcp_client.get_tools()
-    gps_tool = [tool for tool in all_tools if tool.name == "get_latest_location"]
-    news_tools = [t for t in all_tools if t.name in {"get_naver_news","get_yonhap_news","scrape"}]
-    sns_tools = [t for t in all_tools if t.name in {'getVideoDetails','searchVideos','getTranscripts','getVideoComments','get_fire_related_threads_with_replies'}]
-    disaster_tools = [t for t in all_tools if t.name in {'getDisasterMessage','getForestFires','getKMAWeatherWarning'}]
+    # 도구 목록은 ToolRegistry가 캐시하며, 서버 재시작이나 스키마 변경 시에만 다시 조회합니다.
+    partitions = await ToolRegistry.get_partitions()
+    gps_tool = partitions["gps"]
+    news_tools = partitions["news"]
+    sns_tools = partitions["sns"]
+    disaster_tools = partitions["disaster"]
     
-    gps_agent = create_react_agent(
-        llm,
-        tools=gps_tool, # 필터링된 gps_tool을 전달
-        prompt="get_latest_location 도구를 사용해 사용자의 현재 GPS 기반 주소를 찾아주세요.",
-        state_schema=GraphState,
-        response_format=GPSResponse,
-    )
-    gps_response = await gps_agent.ainvoke(state)
-    gps_data = {"address": gps_response["structured_response"].address}
-    print(f"--- GPS 정보 수집 완료: {gps_data['address']} ---")
+    gps_response = None
+    gps_error = None
+    if GPS_RESOLUTION_MODE == "direct" and gps_tool:
+        try:
+            gps_response = await _resolve_gps_direct(gps_tool, state.get("user_id") or DEFAULT_USER_ID)
+        except GPSUnavailable as e:
+            # 도구가 실패를 정상적으로 알린 경우에는 에이전트가 다시 호출해도 결과가 같으므로 그대로 실패로 처리합니다.
+            gps_error = str(e)
+    if gps_response is None and gps_error is None:
+        if GPS_RESOLUTION_MODE == "direct":
+            print("--- GPS 직접 조회 결과가 올바르지 않아 GPS 에이전트로 대체합니다 ---")
+        gps_response = await _resolve_gps_with_agent(state, gps_tool)
+    if gps_error is not None:
+        gps_data = {"address": None, "error": gps_error}
+        print(f"--- GPS 정보 수집 실패: {gps_error} ---")
+    else:
+        gps_data = {"address": gps_response.address}
+        print(f"--- GPS 정보 수집 완료: {gps_data['address']} ---")
     
     # 현재 상태를 복사하고 수집된 GPS 정보를 추가
     current_state = state.copy()
     current_state['GPS'] = gps_data
     
     # 2. 하위 에이전트 병렬 실행
+    # 같은 지역에서 동시에 들어온 요청은 하나의 수집 결과를 공유하고, 최종 답변만 사용자별로 생성합니다.
     print("\n--- 2. 하위 에이전트 병렬 실행 ---")
-    parallel_results = await asyncio.gather(
-        new_agent_node(current_state, news_tools),
-        sns_agent_node(current_state, sns_tools),
-        disaster_agent_node(current_state, disaster_tools),
-        return_exceptions=True
+    region_key, shared_state = _shared_request(current_state, gps_data)
+    parallel_results = await _coalescer.run(
+        region_key,
+        lambda: _run_sub_agents(shared_state, news_tools, sns_tools, disaster_tools),
     )
     print("--- 모든 하위 에이전트 병렬 실행 완료 ---\n")
     
@@ -0,0 +1,20 @@
+import json
+
+def tool_result_to_json(result):
+    """
+    MCP 도구의 실행 결과(텍스트 콘텐츠)를 파이썬 객체로 변환합니다.
+    JSON이 아닌 결과는 문자열 그대로 반환합니다.
+    """
+    if isinstance(result, list):
+        result = "".join(item if isinstance(item, str) else item.get("text", "") for item in result)
+    if not isinstance(result, str):
+        return result
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        return result
+
+async def call_tool_json(tool, arguments: dict = None):
+    """도구를 LLM 없이 직접 호출하고, 결과를 파이썬 객체로 변환하여 반환합니다."""
+    result = await tool.ainvoke(arguments or {})
+    return tool_result_to_json(result)
\ No newline at end of file
@@ -1,11 +1,10 @@
 from pydantic import BaseModel, Field
-from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import AIMessage
 from datetime import datetime
 
 from state import GraphState
-from llm_setup import llm
 from rag.vector_store import retriever
+from .agent_factory import get_react_agent
 
 class UserInteractionResponse(BaseModel):
     use_agent: bool = Field(..., description="사용자 질문에 대해 화재 재난대응 Agent System 사용이 필요한지 여부를 판단")
@@ -20,11 +19,8 @@ async def user_interaction_node(state: GraphState) -> GraphState:
     else:
         return await _initial_analysis(state)
 
-async def _initial_analysis(state: GraphState) -> GraphState:
-    """초기 사용자 질문을 분석하여 에이전트 시스템 사용 여부를 결정합니다."""
-    print("\n======= [Node] User Interaction Agent (초기 분석) 실행 =======")
-    
-    prompt = f"""
+def _initial_analysis_prompt(state: GraphState) -> str:
+    return f"""
     당신은 '화재 재난 대응'을 전문으로 하는 친절한 AI 어시스턴트입니다.
     사용자의 질문을 분석하여 그 의도를 파악하는 것이 당신의 임무입니다.
 
@@ -34,12 +30,12 @@ async def _initial_analysis(state: GraphState) -> GraphState:
     현재 사용자 질문: "{state.get('question', '')}"
     """
 
-    user_interaction_agent = create_react_agent(
-        llm,
-        tools=[],
-        prompt=prompt,
-        state_schema=GraphState,
-        response_format=UserInteractionResponse,
+async def _initial_analysis(state: GraphState) -> GraphState:
+    """초기 사용자 질문을 분석하여 에이전트 시스템 사용 여부를 결정합니다."""
+    print("\n======= [Node] User Interaction Agent (초기 분석) 실행 =======")
+
+    user_interaction_agent = get_react_agent(
+        "user_interaction", [], _initial_analysis_prompt, response_format=UserInteractionResponse
     )
     
     agent_response = await user_interaction_agent.ainvoke(state)
@@ -58,28 +54,10 @@ async def _initial_analysis(state: GraphState) -> GraphState:
         "use_agent": structured_response.use_agent
     }
 
-async def _generate_final_response(state: GraphState) -> GraphState:
-    """모든 에이전트의 분석 결과를 종합하고 RAG 검색을 통해 최종 답변을 생성합니다."""
-    print("\n======= [Node] User Interaction Agent (최종 답변 생성) 실행 =======")
-    print("재난 분석 완료. RAG 시스템을 조회하여 최종 답변을 생성합니다...")
-
-    refined_query = f"""
-    현재 상황: {state.get('news', '')} {state.get('disaster', '')}
-    사용자 위치: {state.get('GPS', '')}
-    질문: "{state.get('question', '')}"
-    이 상황과 위치를 고려했을 때 가장 적절한 행동 요령이나 참고할 만한 과거 화재 사례를 알려줘.
-    """
-
-    retrieved_docs = await retriever.ainvoke(refined_query)
-    rag_context = "\n\n---\n\n".join([doc.page_content for doc in retrieved_docs])
-    
-    print("\n--- RAG 검색 결과 일부 ---")
-    print(rag_context[:500] + "...")
-    print("--------------------------\n")
-    
+def _final_response_prompt(state: GraphState) -> str:
     current_time = datetime.now().strftime("%Y년 %m월 %d일 %H시 %M분")
 
-    final_prompt = f"""
+    return f"""
     당신은 대한민국 최고의 화재 재난 대응 전문가입니다.
     아래에 주어진 모든 정보를 종합하여, 사용자의 위치를 기반으로 실행 가능한 구체적인 행동 방안을 명확하게 제시하세요.
     Let's think step by step using mcp-sequentialthinking-tools.
@@ -99,18 +77,32 @@ async def _generate_final_response(state: GraphState) -> GraphState:
     - SNS 데이터 분석 보고서: {state.get('SNS', '수집된 정보 없음')}
     
     ## RAG 시스템 검색 결과 (화재 대응 매뉴얼 및 과거 사례)
-    {rag_context}
+    {state.get('rag_context', '')}
     """
 
-    final_agent = create_react_agent(
-        llm,
-        # tools=filtered_tools,
-        tools=[],
-        prompt=final_prompt,
-        state_schema=GraphState,
-    )
+async def _generate_final_response(state: GraphState) -> GraphState:
+    """모든 에이전트의 분석 결과를 종합하고 RAG 검색을 통해 최종 답변을 생성합니다."""
+    print("\n======= [Node] User Interaction Agent (최종 답변 생성) 실행 =======")
+    print("재난 분석 완료. RAG 시스템을 조회하여 최종 답변을 생성합니다...")
+
+    refined_query = f"""
+    현재 상황: {state.get('news', '')} {state.get('disaster', '')}
+    사용자 위치: {state.get('GPS', '')}
+    질문: "{state.get('question', '')}"
+    이 상황과 위치를 고려했을 때 가장 적절한 행동 요령이나 참고할 만한 과거 화재 사례를 알려줘.
+    """
+
+    retrieved_docs = await retriever.ainvoke(refined_query)
+    rag_context = "\n\n---\n\n".join([doc.page_content for doc in retrieved_docs])
+    
+    print("\n--- RAG 검색 결과 일부 ---")
+    print(rag_context[:500] + "...")
+    print("--------------------------\n")
+    
+    final_agent = get_react_agent("final_response", [], _final_response_prompt)
     
-    final_response = await final_agent.ainvoke(state)
+    # RAG 검색 결과는 state를 통해 프롬프트에 전달됩니다.
+    final_response = await final_agent.ainvoke({**state, "rag_context": rag_context})
     final_content = final_response["messages"][-1].content
     final_message = AIMessage(content=final_content, name="FinalResponseAgent")
     
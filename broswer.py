@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 """
-웹 서버 - 위치 수집하여 파일 저장
+웹 서버 - 위치 수집하여 사용자별 위치 저장소에 저장
+페이지를 /?user_id=<사용자 또는 스레드 ID> 로 열면 해당 사용자의 위치로 저장됩니다.
 """
 
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-import json
 import uuid
 import uvicorn
+from dotenv import load_dotenv
+
+# 위치 저장소는 import 시점에 환경 변수(LOCATION_*)를 읽으므로 .env를 먼저 로드합니다.
+load_dotenv()
+from mcp_servers.location_store import location_store, DEFAULT_USER_ID
 
 app = FastAPI()
 
@@ -16,6 +21,7 @@ class LocationData(BaseModel):
     latitude: float
     longitude: float
     accuracy: float
+    user_id: str = DEFAULT_USER_ID
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
@@ -37,10 +43,12 @@ async def index():
             document.getElementById('status').innerHTML = '위치 수집 중...';
             
             navigator.geolocation.getCurrentPosition(async (position) => {
+                const userId = new URLSearchParams(window.location.search).get('user_id');
                 const data = {
                     latitude: position.coords.latitude,
                     longitude: position.coords.longitude,
-                    accuracy: position.coords.accuracy
+                    accuracy: position.coords.accuracy,
+                    ...(userId ? { user_id: userId } : {})
                 };
                 
                 const response = await fetch('/save-location', {
@@ -62,18 +70,16 @@ async def index():
 
 @app.post("/save-location")
 async def save_location(location: LocationData):
-    # 파일에 저장
+    # 사용자별 위치 저장소에 저장 (원자적 파일 교체)
     data = {
         "id": str(uuid.uuid4()),
         "latitude": location.latitude,
         "longitude": location.longitude,
         "accuracy": location.accuracy,
     }
+    location_store.save(location.user_id or DEFAULT_USER_ID, data)
     
-    with open("location.json", "w") as f:
-        json.dump(data, f)
-    
-    print(f"위치 저장: {data['latitude']}, {data['longitude']}")
+    print(f"위치 저장 ({location.user_id}): {data['latitude']}, {data['longitude']}")
     return {"success": True, "id": data["id"]}
 
 if __name__ == "__main__":
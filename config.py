@@ -25,11 +25,75 @@ SMITHERY_PROFILE = os.getenv("SMITHERY_PROFILE")
 MODEL_NAME = "gpt-4o"
 RECURSION_LIMIT = 50
 
+# --- MCP Session Pool ---
+# 서버별로 유지할 상시(warm) stdio 세션 수. 0이면 풀을 사용하지 않고 호출마다 세션을 새로 엽니다.
+MCP_SESSION_POOL_SIZE = int(os.getenv("MCP_SESSION_POOL_SIZE", "1"))
+# 세션 헬스 체크(ping) 주기와 응답 대기 시간 (초)
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+MCP_HEALTH_CHECK_TIMEOUT = float(os.getenv("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+
+# --- Tool Output Projection ---
+# 도구 출력에서 프롬프트에 필요한 필드만 남기고, 긴 텍스트(대본, 기사 본문 등)는 필드당 이 토큰 수로 자릅니다.
+TOOL_OUTPUT_PROJECTION = os.getenv("TOOL_OUTPUT_PROJECTION", "true").lower() == "true"
+TOOL_OUTPUT_TEXT_TOKENS = int(os.getenv("TOOL_OUTPUT_TEXT_TOKENS", "800"))
+
+# --- Agent Execution Modes ---
+# "direct": get_latest_location 도구를 직접 호출 (결과가 잘못된 경우에만 에이전트로 대체), "agent": 항상 ReAct 에이전트 사용
+GPS_RESOLUTION_MODE = os.getenv("GPS_RESOLUTION_MODE", "direct")
+# "pipeline": 도구를 코드에서 병렬 호출한 뒤 LLM 요약 1회, "react": 기존 ReAct 에이전트
+DISASTER_AGENT_MODE = os.getenv("DISASTER_AGENT_MODE", "pipeline")
+# "pipeline": 뉴스 검색과 기사 스크랩을 코드에서 병렬 실행한 뒤 LLM 요약 1회, "react": 기존 ReAct 에이전트
+NEWS_AGENT_MODE = os.getenv("NEWS_AGENT_MODE", "pipeline")
+NEWS_NAVER_DISPLAY = int(os.getenv("NEWS_NAVER_DISPLAY", "10"))   # 네이버 뉴스 검색 건수
+NEWS_SCRAPE_TOP_N = int(os.getenv("NEWS_SCRAPE_TOP_N", "2"))      # 본문을 스크랩할 상위 기사 수
+NEWS_SCRAPE_CONCURRENCY = int(os.getenv("NEWS_SCRAPE_CONCURRENCY", "4"))
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.5"))  # 같은 기사로 묶을 MinHash 자카드 유사도 기준
+NEWS_DEDUP_NUM_PERM = int(os.getenv("NEWS_DEDUP_NUM_PERM", "64"))       # MinHash 시그니처 길이
+NEWS_DEDUP_BANDS = int(os.getenv("NEWS_DEDUP_BANDS", "0"))             # LSH 밴드 수 (0이면 기준 유사도에 맞춰 자동 선택)
+NEWS_PROMPT_MAX_CLUSTERS = int(os.getenv("NEWS_PROMPT_MAX_CLUSTERS", "20"))  # 요약 프롬프트에 넣을 최대 클러스터 수
+# "pipeline": SNS 수집과 교차 검증을 코드에서 수행하고 보고서 작성만 LLM이 담당, "react": 기존 ReAct 에이전트
+SNS_AGENT_MODE = os.getenv("SNS_AGENT_MODE", "pipeline")
+SNS_VIDEOS_PER_QUERY = int(os.getenv("SNS_VIDEOS_PER_QUERY", "2"))   # 검색어별 YouTube 영상 수
+SNS_MAX_DEEP_VIDEOS = int(os.getenv("SNS_MAX_DEEP_VIDEOS", "2"))     # 대본/댓글까지 분석할 영상 수
+SNS_CROSS_TIME_WINDOW_HOURS = float(os.getenv("SNS_CROSS_TIME_WINDOW_HOURS", "6"))  # 교차 검증 시 허용 시간 차
+# 같은 지역(시군구)의 요청이 하위 에이전트 수집 결과를 공유하는 시간 (초, 0이면 공유하지 않음)
+REQUEST_COALESCING_WINDOW_SEC = float(os.getenv("REQUEST_COALESCING_WINDOW_SEC", "60"))
+# 위치 수집 페이지(broswer.py) 주소. Streamlit 화면에 사용자별 위치 공유 링크로 표시합니다.
+LOCATION_PAGE_URL = os.getenv("LOCATION_PAGE_URL", "http://localhost:8000").rstrip("/")
+
 # --- File Paths & Directories ---
 PYTHON_EXECUTABLE_PATH = os.getenv("PYTHON_EXECUTABLE_PATH")
 MCP_SERVER_SCRIPT_DIR = os.getenv("MCP_SERVER_SCRIPT_DIR")
 CHROMA_DB_PATH = 'rag/chroma_db'
 RAG_DOCUMENTS_PATH = 'rag/documents'
+RAG_COLLECTION_NAME = 'langchain'   # langchain_chroma 기본 컬렉션 이름
+RAG_MANIFEST_PATH = os.path.join(CHROMA_DB_PATH, 'manifest.json')   # 문서/청크 해시 및 index_version
+RAG_LEXICAL_INDEX_PATH = os.path.join(CHROMA_DB_PATH, 'lexical_index.json')   # BM25 색인용 청크 원문
+
+# --- RAG 벡터 백엔드 ---
+# "chroma": ChromaDB, "faiss": Chroma 컬렉션을 내보낸 FAISS 인덱스를 mmap으로 사용 (여러 워커가 한 파일을 공유)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", 'rag/faiss/index.faiss')
+FAISS_DOCSTORE_PATH = os.getenv("FAISS_DOCSTORE_PATH", 'rag/faiss/docstore.json')
+FAISS_QUANTIZATION = os.getenv("FAISS_QUANTIZATION", "flat")   # flat / sq8(int8) / pq(곱 양자화)
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "64"))                # pq 사용 시 벡터당 서브벡터(바이트) 수
+
+# --- RAG 검색 ---
+# "dense": 벡터 검색, "lexical": BM25 (네트워크 호출 없음), "hybrid": 두 결과를 RRF로 결합 (벡터 검색 실패 시 BM25만 사용)
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+# 쿼리 임베딩 캐시(메모리 LRU + SQLite)와 검색 결과 캐시(임베딩 LSH 버킷 + index_version 키). 재빌드 시 자동 무효화됩니다.
+RAG_QUERY_CACHE = os.getenv("RAG_QUERY_CACHE", "true").lower() in ("1", "true", "yes")
+RAG_EMBEDDING_CACHE_PATH = os.getenv("RAG_EMBEDDING_CACHE_PATH", 'rag/cache/query_embeddings.sqlite')
+RAG_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024"))
+RAG_RETRIEVAL_CACHE_SIZE = int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", "256"))
+RAG_RETRIEVAL_CACHE_TTL = float(os.getenv("RAG_RETRIEVAL_CACHE_TTL", "600"))
+RAG_RETRIEVAL_LSH_BITS = int(os.getenv("RAG_RETRIEVAL_LSH_BITS", "16"))   # 클수록 버킷이 좁아져 비교할 후보가 줄어듦
+RAG_RETRIEVAL_CACHE_SIMILARITY = float(os.getenv("RAG_RETRIEVAL_CACHE_SIMILARITY", "0.95"))   # 이 코사인 유사도 이상인 쿼리만 검색 결과를 공유
+
+# --- RAG 벡터 DB 빌드 (증분 임베딩) ---
+RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))     # 임베딩 요청 1회당 청크 수
+RAG_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))    # 동시 임베딩 요청 수
+RAG_EMBED_MAX_RETRIES = int(os.getenv("RAG_EMBED_MAX_RETRIES", "3"))
 
 # --- MCP Server Script Paths ---
 # MCP_SERVER_SCRIPT_DIR가 정의되지 않았을 경우를 대비한 예외 처리
@@ -135,12 +135,16 @@
 
 import asyncio
 from typing import Dict, Any, Optional
+from urllib.parse import quote
 
 import httpx
 from fastapi import FastAPI, BackgroundTasks
 from pydantic import BaseModel
 
 from main import run_workflow  # 오래 걸리는 작업
+from tool_registry import ToolRegistry
+from config import LOCATION_PAGE_URL
+from mcp_servers.location_store import location_store
 
 app = FastAPI()
 
@@ -191,6 +195,18 @@ class KakaoRequest(BaseModel):
 
 # --- 내부 유틸 ---
 
+def _location_share_output(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    사용자의 위치가 저장되어 있지 않거나 만료되었으면, 이 사용자 ID로 위치를 저장하는 위치 수집 페이지 링크를 반환합니다.
+    (카카오 사용자는 위치 수집 페이지를 직접 열 수 없으므로 응답에 링크를 함께 보냅니다)
+    """
+    location, _ = location_store.get(user_id)
+    if location is not None:
+        return None
+    link = f"{LOCATION_PAGE_URL}/?user_id={quote(user_id, safe='')}"
+    return {"simpleText": {"text": f"📍 아래 링크에서 위치를 공유하면 현재 위치 기준으로 분석해 드립니다.\n{link}"}}
+
+
 async def _post_callback(callback_url: str, payload: Dict[str, Any]) -> None:
     """
     카카오가 제공한 1회용 callbackUrl로 최종 응답을 POST로 전송합니다.
@@ -216,7 +232,7 @@ async def _do_heavy_and_callback(callback_url: str, user_message: str, user_id:
     try:
         # 오래 걸리는 작업은 45초 내 완료를 목표로
         response_text = await asyncio.wait_for(
-            run_workflow(user_message, thread_id=user_id),
+            run_workflow(user_message, thread_id=user_id, user_id=user_id),
             timeout=CALLBACK_TIMEOUT_SEC,
         )
     except asyncio.TimeoutError:
@@ -227,12 +243,14 @@ async def _do_heavy_and_callback(callback_url: str, user_message: str, user_id:
         response_text = "죄송합니다. 요청 처리 중 오류가 발생했습니다."
 
     # 카카오 스킬 "최종" 응답 포맷(JSON)으로 콜백
+    outputs = [{"simpleText": {"text": response_text}}]
+    location_output = _location_share_output(user_id)
+    if location_output is not None:
+        outputs.append(location_output)
     payload = {
         "version": "2.0",
         "template": {
-            "outputs": [
-                {"simpleText": {"text": response_text}}
-            ]
+            "outputs": outputs
         }
     }
     await _post_callback(callback_url, payload)
@@ -275,6 +293,15 @@ async def chat(request: KakaoRequest, background_tasks: BackgroundTasks):
     }
 
 
+@app.on_event("startup")
+async def warm_up_tools():
+    """서버 시작 시 MCP 세션과 도구 목록을 미리 준비해 첫 요청의 지연을 줄입니다."""
+    try:
+        await ToolRegistry.get_partitions()
+    except Exception as e:
+        print(f"⚠️ MCP 도구 사전 로드 실패 (첫 요청 시 다시 시도합니다): {e}")
+
+
 @app.get("/health")
 async def health():
     return {"status": "OK"}
\ No newline at end of file
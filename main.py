@@ -1,10 +1,14 @@
 import asyncio
 from langchain_core.messages import HumanMessage
 from graph import app
-from config import RECURSION_LIMIT
+from config import RECURSION_LIMIT, LOCATION_PAGE_URL
+from mcp_servers.location_store import DEFAULT_USER_ID
 
-async def run_workflow(question: str, thread_id: str):
-    """워크플로우를 실행하고 최종 결과를 반환합니다."""
+async def run_workflow(question: str, thread_id: str, user_id: str = None):
+    """
+    워크플로우를 실행하고 최종 결과를 반환합니다.
+    user_id는 위치 저장소에서 사용자의 위치를 찾는 데 사용하며, 주지 않으면 thread_id를 사용합니다.
+    """
     
     config = {
         "recursion_limit": RECURSION_LIMIT, 
@@ -26,7 +30,7 @@ async def run_workflow(question: str, thread_id: str):
     # }
     
     # Checkpointer가 thread_id를 보고 이전 대화 기록을 알아서 불러옵니다.
-    input_data = {"messages": [HumanMessage(content=question)]}
+    input_data = {"messages": [HumanMessage(content=question)], "user_id": user_id or thread_id}
     
     print(f"\n🚀 [Thread ID: {thread_id}] 질문: '{question}'에 대한 분석을 시작합니다.")
     
@@ -48,7 +52,9 @@ def main():
     print("="*50)
     print("🚨 재난 대응 AI 에이전트 🚨")
     print("="*50)
-    print("종료하려면 'exit' 또는 'quit'를 입력하세요.\n")
+    print("종료하려면 'exit' 또는 'quit'를 입력하세요.")
+    # CLI는 로컬 단일 사용자이므로 위치 수집 페이지를 user_id 없이 열었을 때 저장되는 기본 사용자 위치를 사용합니다.
+    print(f"📍 위치 공유: {LOCATION_PAGE_URL}/ (브라우저에서 열어 위치를 저장하세요)\n")
     
     thread_id = "interactive-session"
     
@@ -65,7 +71,7 @@ def main():
                 print("⚠️  질문을 입력해주세요.")
                 continue
             
-            response = asyncio.run(run_workflow(user_question, thread_id))
+            response = asyncio.run(run_workflow(user_question, thread_id, user_id=DEFAULT_USER_ID))
             print(f"\n🤖 AI: {response}")
             
         except KeyboardInterrupt:
@@ -1,5 +1,9 @@
 import asyncio
+import threading
+from contextlib import asynccontextmanager
+from langchain_core.tools import StructuredTool, ToolException
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from config import (
     PYTHON_EXECUTABLE_PATH,
     NEWS_MCP_SERVER_PATH,
@@ -7,100 +11,363 @@ from config import (
     DISASTER_MCP_SERVER_PATH,
     SNS_MCP_SERVER_PATH,
     SMITHERY_KEY,
-    SMITHERY_PROFILE
+    SMITHERY_PROFILE,
+    MCP_SESSION_POOL_SIZE,
+    MCP_HEALTH_CHECK_INTERVAL,
+    MCP_HEALTH_CHECK_TIMEOUT,
 )
 
+def _server_connections():
+    """MCP 서버별 stdio 실행 설정을 반환합니다."""
+    return {
+        "news_mcp_server": {
+            "command": PYTHON_EXECUTABLE_PATH,
+            "args": [NEWS_MCP_SERVER_PATH],
+            "transport": "stdio",
+        },
+        "GPS_mcp_server": {
+            "command": PYTHON_EXECUTABLE_PATH,
+            "args": [GPS_MCP_SERVER_PATH],
+            "transport": "stdio",
+        },
+        "disaster_mcp_server": {
+            "command": PYTHON_EXECUTABLE_PATH,
+            "args": [DISASTER_MCP_SERVER_PATH],
+            "transport": "stdio",
+        },
+        "SNS_mcp_server": {
+            "command": PYTHON_EXECUTABLE_PATH,
+            "args": [SNS_MCP_SERVER_PATH],
+            "transport": "stdio",
+        },
+        # "mcp-server-serper": {
+        #     "command": "npx",
+        #     "args": [
+        #         "-y",
+        #         "@smithery/cli@latest",
+        #         "run",
+        #         "@marcopesani/mcp-server-serper",
+        #         "--key",
+        #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
+        #         "--profile",
+        #         "independent-ocelot-465lJ3"
+        #     ],
+        #     "transport": "stdio",
+        # },
+        # "firecrawl-mcp-server": { serper 사용, firecrawl 사용 x
+        #     "command": "npx",
+        #     "args": [
+        #         "-y",
+        #         "@smithery/cli@latest",
+        #         "run",
+        #         "@Krieg2065/firecrawl-mcp-server",
+        #         "--key",
+        #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
+        #         "--profile",
+        #         "independent-ocelot-465lJ3"
+        #     ],
+        #     "transport": "stdio",
+        # },
+        # "server-sequential-thinking": {
+        #     "command": "npx",
+        #     "args": [
+        #         "-y",
+        #         "@smithery/cli@latest",
+        #         "run",
+        #         "@smithery-ai/server-sequential-thinking",
+        #         "--key",
+        #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
+        #         "--profile",
+        #         "independent-ocelot-465lJ3"
+        #     ],
+        #     "transport": "stdio",
+        # },
+    }
+
+
+async def _run_on(loop, coro):
+    """
+    코루틴을 지정한 이벤트 루프에서 실행하고 결과를 기다립니다.
+    세션 풀은 전용 루프에 묶여 있으므로, 다른 루프(asyncio.run()마다 새로 만들어지는 루프 등)에서 호출하면 스레드 간으로 넘겨 실행합니다.
+    """
+    if loop is None or loop is asyncio.get_running_loop():
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+class _PooledSession:
+    """
+    상시 실행되는 단일 stdio 세션입니다.
+    stdio 클라이언트는 진입한 태스크 안에서 종료되어야 하므로, 전용 태스크가 세션의 수명을 관리합니다.
+    """
+
+    def __init__(self, client: MultiServerMCPClient, server_name: str):
+        self._client = client
+        self.server_name = server_name
+        self.session = None
+        self.tools = {}
+        self.inflight = 0
+        self.error = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.error:
+            raise self.error
+
+    async def _run(self):
+        try:
+            async with self._client.session(self.server_name) as session:
+                tools = await load_mcp_tools(session)
+                self.tools = {tool.name: tool for tool in tools}
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self.error = e
+            print(f"🚨 [MCP Pool] '{self.server_name}' 세션 오류: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self) -> bool:
+        """세션이 응답하는지 확인합니다."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=MCP_HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception:
+                pass
+
+
+class MCPServerPool:
+    """
+    하나의 MCP 서버에 대해 여러 개의 상시 세션을 유지하는 풀입니다.
+    호출은 진행 중인 요청이 가장 적은 세션으로 분배되며, 응답하지 않는 세션은 재시작됩니다.
+    """
+
+    def __init__(self, client: MultiServerMCPClient, server_name: str, size: int):
+        self._client = client
+        self.server_name = server_name
+        self.size = max(1, size)
+        self.sessions = []
+        # 세션이 재시작될 때마다 증가합니다. 도구 목록 캐시 무효화에 사용됩니다.
+        self.generation = 0
+        self.loop = None
+        self._restart_lock = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._restart_lock = asyncio.Lock()
+        self.sessions = [_PooledSession(self._client, self.server_name) for _ in range(self.size)]
+        await asyncio.gather(*(session.start() for session in self.sessions))
+        print(f"✅ [MCP Pool] '{self.server_name}' 세션 {self.size}개 준비 완료")
+
+    async def _restart(self, index: int) -> _PooledSession:
+        async with self._restart_lock:
+            current = self.sessions[index]
+            if current.alive:
+                # 다른 호출이 이미 재시작을 마쳤습니다.
+                return current
+            print(f"--- [MCP Pool] '{self.server_name}' 세션 #{index} 재시작 ---")
+            await current.close()
+            replacement = _PooledSession(self._client, self.server_name)
+            await replacement.start()
+            self.sessions[index] = replacement
+            self.generation += 1
+            return replacement
+
+    @asynccontextmanager
+    async def acquire(self):
+        """진행 중인 호출이 가장 적은 살아있는 세션을 빌려줍니다."""
+        index = min(range(len(self.sessions)), key=lambda i: (not self.sessions[i].alive, self.sessions[i].inflight))
+        pooled = self.sessions[index]
+        if not pooled.alive:
+            pooled = await self._restart(index)
+
+        pooled.inflight += 1
+        try:
+            yield pooled
+        except ToolException:
+            # 도구 자체의 오류는 세션 상태와 무관합니다.
+            raise
+        except Exception:
+            if not await pooled.ping():
+                await pooled.close()
+            raise
+        finally:
+            pooled.inflight -= 1
+
+    async def health_check(self):
+        """모든 세션에 ping을 보내고 응답하지 않는 세션을 재시작합니다."""
+        for index, pooled in enumerate(list(self.sessions)):
+            if not await pooled.ping():
+                try:
+                    await pooled.close()
+                    await self._restart(index)
+                except Exception as e:
+                    print(f"🚨 [MCP Pool] '{self.server_name}' 세션 #{index} 재시작 실패: {e}")
+
+    async def _list_tools(self):
+        async with self.acquire() as pooled:
+            return list(pooled.tools.values())
+
+    async def list_tools(self):
+        """현재 세션이 제공하는 도구 목록(세션에 바인딩된 도구)을 반환합니다."""
+        return await _run_on(self.loop, self._list_tools())
+
+    async def _call_tool(self, tool_name: str, arguments: dict):
+        async with self.acquire() as pooled:
+            return await pooled.tools[tool_name].coroutine(**arguments)
+
+    def pooled_tool(self, base_tool: StructuredTool) -> StructuredTool:
+        """호출 시점에 풀에서 세션을 빌려 실행하는 도구로 감쌉니다."""
+        tool_name = base_tool.name
+
+        async def call_tool(**arguments):
+            return await _run_on(self.loop, self._call_tool(tool_name, arguments))
+
+        return StructuredTool(
+            name=base_tool.name,
+            description=base_tool.description,
+            args_schema=base_tool.args_schema,
+            coroutine=call_tool,
+            response_format=base_tool.response_format,
+            metadata=base_tool.metadata,
+        )
+
+    async def close(self):
+        await asyncio.gather(*(session.close() for session in self.sessions), return_exceptions=True)
+        self.sessions = []
+
+
+class PooledMCPClient:
+    """
+    MultiServerMCPClient와 같은 get_tools() 인터페이스를 제공하면서,
+    도구 호출마다 서버 프로세스를 새로 띄우는 대신 서버별 세션 풀을 재사용합니다.
+    세션은 전용 스레드의 이벤트 루프에서 실행되므로, 호출하는 쪽의 루프가 바뀌거나(Streamlit의 메시지별 asyncio.run())
+    여러 스레드에서 동시에 호출해도 같은 풀을 계속 사용합니다.
+    """
+
+    def __init__(self, connections: dict, pool_size: int):
+        self._client = MultiServerMCPClient(connections)
+        self.pools = {name: MCPServerPool(self._client, name, pool_size) for name in connections}
+        self.loop = None
+        self._thread = None
+        self._health_task = None
+
+    def start(self):
+        """전용 이벤트 루프 스레드를 띄우고, 모든 세션이 준비될 때까지 기다립니다. (블로킹)"""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="mcp-session-pool", daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        except Exception:
+            asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+            self._stop_loop()
+            raise
+
+    async def _start(self):
+        await asyncio.gather(*(pool.start() for pool in self.pools.values()))
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(MCP_HEALTH_CHECK_INTERVAL)
+            for pool in self.pools.values():
+                await pool.health_check()
+
+    async def get_tools(self, server_name: str = None):
+        """풀 기반 도구 목록을 반환합니다. server_name을 지정하면 해당 서버의 도구만 반환합니다."""
+        names = [server_name] if server_name else list(self.pools)
+        tools = []
+        for name in names:
+            pool = self.pools[name]
+            tools.extend(pool.pooled_tool(tool) for tool in await pool.list_tools())
+        return tools
+
+    async def _close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()), return_exceptions=True)
+
+    def _stop_loop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+    async def close(self):
+        """모든 세션(서버 프로세스)을 종료하고 전용 루프 스레드를 멈춥니다."""
+        if self.loop is None or self.loop.is_closed():
+            return
+        await _run_on(self.loop, self._close())
+        await asyncio.to_thread(self._stop_loop)
+
+
 class MCPClientManager:
     """
     MultiServerMCPClient 인스턴스를 싱글톤으로 관리하는 클래스입니다.
     애플리케이션 전체에서 단 하나의 클라이언트 연결을 유지합니다.
+    MCP_SESSION_POOL_SIZE가 1 이상이면 서버별 상시 세션 풀(PooledMCPClient)을 사용합니다.
     """
     _instance = None
     client = None
+    # 동시에 들어온 첫 호출들이 각자 풀(서버 프로세스)을 띄우지 않도록 생성을 직렬화합니다.
+    # 호출하는 스레드/이벤트 루프가 여러 개일 수 있으므로 threading.Lock을 사용합니다.
+    _lock = threading.Lock()
 
     @classmethod
-    async def get_client(cls):
-        """
-        MCP 클라이언트 인스턴스를 비동기적으로 생성하고 반환합니다.
-        이미 인스턴스가 존재하면 기존 인스턴스를 반환합니다.
-        """
-        if cls.client is None:
+    def _create_client(cls):
+        """잠금을 잡고 클라이언트를 한 번만 생성합니다. (세션 풀 준비를 기다리므로 워커 스레드에서 호출)"""
+        with cls._lock:
+            if cls.client is not None:
+                return cls.client
             if not all([PYTHON_EXECUTABLE_PATH, NEWS_MCP_SERVER_PATH, GPS_MCP_SERVER_PATH, DISASTER_MCP_SERVER_PATH, SNS_MCP_SERVER_PATH]):
                  raise ValueError("MCP 서버 실행에 필요한 경로가 .env 파일에 올바르게 설정되지 않았습니다.")
-            
+
             try:
-                cls.client = MultiServerMCPClient({
-                    "news_mcp_server": {
-                        "command": PYTHON_EXECUTABLE_PATH,
-                        "args": [NEWS_MCP_SERVER_PATH],
-                        "transport": "stdio",
-                    },
-                    "GPS_mcp_server": {
-                        "command": PYTHON_EXECUTABLE_PATH,
-                        "args": [GPS_MCP_SERVER_PATH],
-                        "transport": "stdio",
-                    },
-                    "disaster_mcp_server": {
-                        "command": PYTHON_EXECUTABLE_PATH,
-                        "args": [DISASTER_MCP_SERVER_PATH],
-                        "transport": "stdio",
-                    },
-                    "SNS_mcp_server": {
-                        "command": PYTHON_EXECUTABLE_PATH,
-                        "args": [SNS_MCP_SERVER_PATH],
-                        "transport": "stdio",
-                    },
-                    # "mcp-server-serper": {
-                    #     "command": "npx",
-                    #     "args": [
-                    #         "-y",
-                    #         "@smithery/cli@latest",
-                    #         "run",
-                    #         "@marcopesani/mcp-server-serper",
-                    #         "--key",
-                    #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
-                    #         "--profile",
-                    #         "independent-ocelot-465lJ3"
-                    #     ],
-                    #     "transport": "stdio",
-                    # },
-                    # "firecrawl-mcp-server": { serper 사용, firecrawl 사용 x
-                    #     "command": "npx",
-                    #     "args": [
-                    #         "-y",
-                    #         "@smithery/cli@latest",
-                    #         "run",
-                    #         "@Krieg2065/firecrawl-mcp-server",
-                    #         "--key",
-                    #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
-                    #         "--profile",
-                    #         "independent-ocelot-465lJ3"
-                    #     ],
-                    #     "transport": "stdio",
-                    # },
-                    # "server-sequential-thinking": {
-                    #     "command": "npx",
-                    #     "args": [
-                    #         "-y",
-                    #         "@smithery/cli@latest",
-                    #         "run",
-                    #         "@smithery-ai/server-sequential-thinking",
-                    #         "--key",
-                    #         "484ebb5c-bd4f-4247-a1c6-e1223235a463",
-                    #         "--profile",
-                    #         "independent-ocelot-465lJ3"
-                    #     ],
-                    #     "transport": "stdio",
-                    # },
-                })
+                if MCP_SESSION_POOL_SIZE > 0:
+                    client = PooledMCPClient(_server_connections(), MCP_SESSION_POOL_SIZE)
+                    client.start()
+                    cls.client = client
+                else:
+                    cls.client = MultiServerMCPClient(_server_connections())
             except Exception as e:
                 print(f"MCP 클라이언트 초기화 오류: {e}")
                 raise
+            return cls.client
+
+    @classmethod
+    async def get_client(cls):
+        """
+        MCP 클라이언트 인스턴스를 비동기적으로 생성하고 반환합니다.
+        이미 인스턴스가 존재하면 기존 인스턴스를 반환합니다.
+        세션 풀은 자체 이벤트 루프에서 실행되므로, 호출하는 쪽의 루프가 바뀌어도 다시 만들지 않습니다.
+        """
+        if cls.client is None:
+            await asyncio.to_thread(cls._create_client)
         return cls.client
 
     @classmethod
     async def close(cls):
         """MCP 클라이언트 연결을 종료합니다."""
-        if cls.client:
-            # 새로운 API에서는 별도의 종료 메서드가 필요할 수 있습니다
-            cls.client = None
\ No newline at end of file
+        client = cls.client
+        cls.client = None
+        if isinstance(client, PooledMCPClient):
+            await client.close()
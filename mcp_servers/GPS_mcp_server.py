@@ -1,47 +1,74 @@
 import os
-import json
+import asyncio
 import requests
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-from typing import Dict
+from typing import Dict, List
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 dotenv_path = os.path.join(project_root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
+# 아래 헬퍼 모듈은 import 시점에 환경 변수를 읽으므로 .env를 로드한 뒤 import합니다.
+from async_utils import to_async, run_blocking
+from http_session import http_get
+from geo_cache import geocode_cache, geohash_encode
+from location_store import location_store, DEFAULT_USER_ID
+
 mcp = FastMCP("GPS_mcp_server")
 
-def get_address_from_coords(latitude: float, longitude: float, rest_api_key: str) -> str:
-    """카카오 지도 API를 통해 좌표를 주소로 변환합니다."""
+ADDRESS_NOT_FOUND = "주소 정보를 찾을 수 없습니다."
+
+def _request_address(latitude: float, longitude: float, rest_api_key: str):
+    """카카오 지도 API를 호출해 (주소, 성공 여부)를 반환합니다."""
     url = "https://dapi.kakao.com/v2/local/geo/coord2address.json"
     headers = {"Authorization": f"KakaoAK {rest_api_key}"}
     params = {"x": longitude, "y": latitude}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = http_get(url, headers=headers, params=params, timeout=5)
         response.raise_for_status() # 200 OK가 아니면 예외 발생
         
         documents = response.json().get('documents', [])
         if documents:
-            return documents[0]['address']['address_name']
+            return documents[0]['address']['address_name'], True
         else:
-            return "주소 정보를 찾을 수 없습니다."
+            return ADDRESS_NOT_FOUND, False
     except requests.exceptions.RequestException as e:
-        return f"API 요청 실패: {e}"
+        return f"API 요청 실패: {e}", False
+
+def get_address_from_coords(latitude: float, longitude: float, rest_api_key: str) -> str:
+    """
+    카카오 지도 API를 통해 좌표를 주소로 변환합니다.
+    같은 지오해시 셀의 주소가 캐시에 있으면 API를 호출하지 않습니다. (실패 결과는 캐시하지 않음)
+    """
+    geohash = geohash_encode(latitude, longitude)
+    address = geocode_cache.get(geohash)
+    if address is not None:
+        return address
+    address, ok = _request_address(latitude, longitude, rest_api_key)
+    if ok:
+        geocode_cache.set(geohash, address)
+    return address
 
 @mcp.tool()
-def get_latest_location() -> Dict:
-    """최신 사용자 위치 정보와 카카오 주소 반환"""
+@to_async
+def get_latest_location(user_id: str = DEFAULT_USER_ID) -> Dict:
+    """
+    사용자(user_id)의 최신 위치 정보와 카카오 주소 반환.
+    해당 사용자의 위치가 없으면 다른 사용자의 위치를 쓰지 않고 실패({"success": False})를 반환합니다.
+    """
+    location, reason = location_store.get(user_id)
+    if location is None:
+        if reason == "expired":
+            return {"success": False, "message": "저장된 위치 정보가 만료되었습니다. 위치를 다시 공유해주세요."}
+        return {"success": False, "message": f"'{user_id}' 사용자의 위치 정보를 찾을 수 없습니다."}
     try:
-        with open("mcp_servers/location.json", "r") as f:
-            data = json.load(f)
-        latitude = data['latitude']
-        longitude = data['longitude']
-    except FileNotFoundError:
-        return {"success": False, "message": "위치 데이터 파일(location.json)을 찾을 수 없습니다."}
-    except (json.JSONDecodeError, KeyError) as e:
-        return {"success": False, "message": f"위치 데이터 파일 형식 오류: {e}"}
+        latitude = float(location['latitude'])
+        longitude = float(location['longitude'])
+    except (KeyError, TypeError, ValueError) as e:
+        return {"success": False, "message": f"위치 데이터 형식 오류: {e}"}
 
     KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
     if not KAKAO_REST_API_KEY:
@@ -50,5 +77,45 @@ def get_latest_location() -> Dict:
     address = get_address_from_coords(latitude, longitude, KAKAO_REST_API_KEY)
     return {"address": address}
 
+@mcp.tool()
+async def reverse_geocode_batch(coordinates: List[Dict[str, float]]) -> List[Dict]:
+    """
+    여러 좌표를 한 번에 주소로 변환합니다.
+    coordinates: [{"latitude": 37.56, "longitude": 126.94}, ...]
+    같은 지오해시 셀의 좌표는 한 번만 조회하고, 캐시에 없는 셀만 카카오 API를 동시에 호출합니다.
+    결과는 입력 순서대로 [{"latitude", "longitude", "address"}] 형태입니다.
+    """
+    KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
+    if not KAKAO_REST_API_KEY:
+        return [{"success": False, "message": "KAKAO_REST_API_KEY가 .env 파일에 설정되지 않았습니다."}]
+
+    cells = {}
+    for point in coordinates:
+        try:
+            latitude, longitude = float(point["latitude"]), float(point["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        cells.setdefault(geohash_encode(latitude, longitude), (latitude, longitude))
+
+    addresses = await asyncio.gather(*(
+        run_blocking(get_address_from_coords, latitude, longitude, KAKAO_REST_API_KEY)
+        for latitude, longitude in cells.values()
+    ))
+    by_cell = dict(zip(cells.keys(), addresses))
+
+    results = []
+    for point in coordinates:
+        try:
+            latitude, longitude = float(point["latitude"]), float(point["longitude"])
+        except (KeyError, TypeError, ValueError):
+            results.append({"success": False, "message": f"좌표 형식 오류: {point}"})
+            continue
+        results.append({
+            "latitude": latitude,
+            "longitude": longitude,
+            "address": by_cell[geohash_encode(latitude, longitude)],
+        })
+    return results
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -2,14 +2,19 @@
 
 import os
 import json
+import asyncio
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 from typing import Dict, List, Any, Optional
 
 # --- 새로운 Import ---
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from youtube_transcript_api import YouTubeTranscriptApi
 
@@ -18,6 +23,11 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 dotenv_path = os.path.join(project_root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
+# 아래 헬퍼 모듈은 import 시점에 환경 변수를 읽으므로 .env를 로드한 뒤 import합니다.
+from async_utils import to_async, run_blocking
+from http_session import http_get
+from tool_cache import tool_cache
+
 mcp = FastMCP("SNS_mcp_server")
 
 # --- YouTube API 헬퍼 ---
@@ -25,27 +35,77 @@ YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 YOUTUBE_API_SERVICE_NAME = "youtube"
 YOUTUBE_API_VERSION = "v3"
 
+YOUTUBE_REST_BASE_URL = "https://www.googleapis.com/youtube/v3"
+# "client": googleapiclient 사용 (정적 discovery 문서), "rest": discovery 없이 REST API 직접 호출
+YOUTUBE_API_MODE = os.getenv("YOUTUBE_API_MODE", "client")
+
+class YouTubeAPIError(Exception):
+    """YouTube Data API 호출 실패 (HTTP 상태 코드와 응답 본문 포함)"""
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status} {message}")
+        self.status = status
+        self.message = message
+
+@lru_cache(maxsize=1)
+def _youtube_discovery_document() -> dict:
+    """googleapiclient에 포함된 정적 discovery 문서를 프로세스당 한 번만 읽어 파싱합니다."""
+    return json.loads(get_static_doc(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION))
+
+# httplib2 기반 서비스 객체는 스레드 안전하지 않으므로 도구 스레드마다 하나씩 캐시합니다.
+_youtube_local = threading.local()
+
 def get_youtube_service():
-    """Google API 클라이언트 서비스 객체를 생성하여 반환합니다."""
+    """Google API 클라이언트 서비스 객체를 반환합니다. (스레드별로 한 번만 생성하여 재사용)"""
     if not YOUTUBE_API_KEY:
         # API 키가 없으면 에러를 발생시키지 않고, 도구 사용 시 에러를 반환하도록 합니다.
         return None
-    try:
-        service = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, developerKey=YOUTUBE_API_KEY)
+    service = getattr(_youtube_local, "service", None)
+    if service is not None:
         return service
+    try:
+        service = build_from_document(_youtube_discovery_document(), developerKey=YOUTUBE_API_KEY)
     except Exception as e:
         print(f"❌ YouTube 서비스 빌드 중 오류 발생: {e}")
         return None
+    _youtube_local.service = service
+    return service
 
-# --- Threads 도구 (기존과 동일) ---
+def youtube_list(resource: str, **params) -> dict:
+    """
+    YouTube Data API의 {resource}.list를 호출합니다. (resource: search, videos, commentThreads)
+    YOUTUBE_API_MODE가 "rest"이면 discovery 없이 공유 HTTP 세션으로 직접 호출합니다.
+    실패 시 YouTubeAPIError를 발생시킵니다.
+    """
+    if YOUTUBE_API_MODE == "rest":
+        if not YOUTUBE_API_KEY:
+            raise YouTubeAPIError(0, "YOUTUBE_API_KEY가 설정되지 않았습니다.")
+        response = http_get(f"{YOUTUBE_REST_BASE_URL}/{resource}", params={**params, "key": YOUTUBE_API_KEY}, timeout=10)
+        if response.status_code != 200:
+            raise YouTubeAPIError(response.status_code, response.text)
+        return response.json()
+
+    youtube = get_youtube_service()
+    if not youtube:
+        raise YouTubeAPIError(0, "YOUTUBE_API_KEY가 설정되지 않았거나 서비스 초기화에 실패했습니다.")
+    try:
+        return getattr(youtube, resource)().list(**params).execute()
+    except HttpError as e:
+        raise YouTubeAPIError(e.resp.status, e.content.decode())
+
+# --- Threads 도구 ---
 THREADS_BASE_URL = "https://graph.threads.net/v1.0"
+THREADS_MAX_PAGES = int(os.getenv("THREADS_MAX_PAGES", "4"))                  # 기간 필터링을 위해 읽을 최대 페이지 수
+THREADS_REPLY_CONCURRENCY = int(os.getenv("THREADS_REPLY_CONCURRENCY", "5"))  # 댓글 동시 요청 수
+
+# 도구 스레드 풀과 분리된 댓글 전용 풀 (도구 스레드 안에서 제출하므로 같은 풀을 쓰면 교착될 수 있음)
+_reply_executor = ThreadPoolExecutor(max_workers=THREADS_REPLY_CONCURRENCY, thread_name_prefix="threads-replies")
 
 def _get_replies_for_thread(media_id: str, access_token: str) -> List[Dict[str, Any]]:
     """주어진 게시물 ID에 대한 댓글(답글) 목록을 가져오는 헬퍼 함수입니다."""
     url = f"{THREADS_BASE_URL}/{media_id}/replies"
     params = {'access_token': access_token, 'fields': 'id,text,timestamp,author_id,permalink'}
     try:
-        response = requests.get(url, params=params, timeout=5)
+        response = http_get(url, params=params, timeout=5)
         if response.status_code == 200:
             return response.json().get('data', [])
     except requests.exceptions.RequestException:
@@ -100,10 +160,11 @@ def _get_replies_for_thread(media_id: str, access_token: str) -> List[Dict[str,
 #     return json.dumps(final_result, indent=2, ensure_ascii=False)
 
 @mcp.tool()
+@to_async
 def get_fire_related_threads_with_replies(start_date: str, end_date: str, max_results: int = 5) -> str:
     """
     '화재' TAG가 포함된 최신 Threads 게시물을 검색합니다.
-    API에서 받아온 데이터를 'start_date'와 'end_date' 사이의 기간으로 필터링합니다.
+    API에서 받아온 데이터를 'start_date'와 'end_date' 사이의 기간으로 필터링하며, 결과가 부족하면 다음 페이지를 이어서 조회합니다.
     :param start_date: 검색 시작일 (YYYY-MM-DD 형식의 문자열)
     :param end_date: 검색 종료일 (YYYY-MM-DD 형식의 문자열)
     :param max_results: 반환할 최대 결과 수 (기본 5)
@@ -135,35 +196,57 @@ def get_fire_related_threads_with_replies(start_date: str, end_date: str, max_re
     
     final_result = []
     try:
-        response = requests.get(search_url, params=search_params, timeout=10)
-        response.raise_for_status() # 오류 발생 시 예외
-        
-        threads = response.json().get('data', [])
-        if not threads:
-            return json.dumps({"message": "'화재' 관련 게시물을 찾을 수 없습니다."}, indent=2, ensure_ascii=False)
+        # --- 2. API가 시간 필터링을 안 해주므로, 페이지를 넘기며 직접 필터링 ---
+        page_params = search_params
+        for page in range(THREADS_MAX_PAGES):
+            response = http_get(search_url, params=page_params, timeout=10)
+            response.raise_for_status() # 오류 발생 시 예외
 
-        # --- 2. API가 시간 필터링을 안 해주므로, 여기서 직접 필터링 ---
-        for thread in threads:
-            if len(final_result) >= max_results: # 원하는 결과 수를 채우면 중단
+            payload = response.json()
+            threads = payload.get('data', [])
+            if not threads:
+                if page == 0:
+                    return json.dumps({"message": "'화재' 관련 게시물을 찾을 수 없습니다."}, indent=2, ensure_ascii=False)
                 break
-            
-            try:
-                # API에서 받은 timestamp (예: "2025-09-09T02:04:52+0000")를 datetime 객체로 변환
-                post_time_utc = datetime.fromisoformat(thread['timestamp'])
-                
-                # 3. 게시물 시간이 우리가 지정한 기간 내에 있는지 확인
-                if since_time_utc <= post_time_utc <= until_time_utc:
-                    thread_id = thread.get('id')
-                    if thread_id:
-                        replies = _get_replies_for_thread(thread_id, ACCESS_TOKEN)
-                        thread['replies'] = replies
-                    final_result.append(thread)
-                        
-            except (KeyError, ValueError, TypeError):
-                # timestamp 형식이 잘못되었거나 없는 경우 건너뜀
-                continue 
+
+            oldest_post_utc = None
+            for thread in threads:
+                if len(final_result) >= max_results: # 원하는 결과 수를 채우면 중단
+                    break
+
+                try:
+                    # API에서 받은 timestamp (예: "2025-09-09T02:04:52+0000")를 datetime 객체로 변환
+                    post_time_utc = datetime.fromisoformat(thread['timestamp'])
+                    oldest_post_utc = post_time_utc if oldest_post_utc is None else min(oldest_post_utc, post_time_utc)
+
+                    # 3. 게시물 시간이 우리가 지정한 기간 내에 있는지 확인
+                    if since_time_utc <= post_time_utc <= until_time_utc:
+                        final_result.append(thread)
+
+                except (KeyError, ValueError, TypeError):
+                    # timestamp 형식이 잘못되었거나 없는 경우 건너뜀
+                    continue
+
+            if len(final_result) >= max_results:
+                break
+            # 최신순으로 받으므로, 이 페이지에 이미 기간 이전의 게시물이 있으면 다음 페이지는 볼 필요가 없습니다.
+            if oldest_post_utc is not None and oldest_post_utc < since_time_utc:
+                break
+            after_cursor = ((payload.get('paging') or {}).get('cursors') or {}).get('after')
+            if not after_cursor:
+                break
+            page_params = {**search_params, 'after': after_cursor}
         # --- 필터링 끝 ---
 
+        # 4. 선택된 게시물의 댓글을 제한된 동시성으로 한꺼번에 가져옵니다.
+        reply_lists = list(_reply_executor.map(
+            lambda thread: _get_replies_for_thread(thread['id'], ACCESS_TOKEN) if thread.get('id') else None,
+            final_result,
+        ))
+        for thread, replies in zip(final_result, reply_lists):
+            if replies is not None:
+                thread['replies'] = replies
+
         if not final_result:
             return json.dumps({"message": f"'{start_date}'부터 '{end_date}' 사이의 '화재' 관련 게시물을 찾을 수 없습니다."}, indent=2, ensure_ascii=False)
 
@@ -182,6 +265,7 @@ def get_fire_related_threads_with_replies(start_date: str, end_date: str, max_re
 # --- (신규) YouTube 도구 4개 ---
 
 @mcp.tool()
+@to_async
 def searchVideos(query: str, max_results: int = 5, order: str = "date") -> dict:
     """
     쿼리 문자열을 기반으로 YouTube 동영상을 검색합니다. (search.list)
@@ -189,79 +273,80 @@ def searchVideos(query: str, max_results: int = 5, order: str = "date") -> dict:
     :param query: 검색할 키워드 (예: "서울역 화재")
     :param max_results: 반환할 최대 결과 수 (기본 5)
     :param order: 정렬 순서 (기본 'date', 'relevance', 'viewCount' 등)
+    같은 검색 조건의 결과는 TOOL_CACHE_TTL 동안 사용자 간에 공유합니다. (search.list는 호출당 할당량 100을 사용)
     """
-    youtube = get_youtube_service()
-    if not youtube:
-        return {"error": "YOUTUBE_API_KEY가 설정되지 않았거나 서비스 초기화에 실패했습니다."}
-    
     try:
         # 24시간 이내 검색을 위한 시간 계산
         twenty_four_hours_ago = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
 
-        search_response = youtube.search().list(
-            q=query,
-            part="snippet",
-            maxResults=max_results,
-            order=order,
-            type="video",
-            publishedAfter=twenty_four_hours_ago # 24시간 이내로 제한
-        ).execute()
+        # publishedAfter는 호출마다 달라지므로 캐시 키에서는 빼고, TTL 시간 구간으로 최신성을 보장합니다.
+        cache_params = {"q": query, "maxResults": max_results, "order": order}
+        search_response = tool_cache.get_or_fetch(
+            f"{YOUTUBE_REST_BASE_URL}/search",
+            cache_params,
+            lambda: youtube_list(
+                "search",
+                q=query,
+                part="snippet",
+                maxResults=max_results,
+                order=order,
+                type="video",
+                publishedAfter=twenty_four_hours_ago # 24시간 이내로 제한
+            ),
+        )
         return search_response
-    except HttpError as e:
-        return {"error": f"YouTube API 오류: {e.resp.status} {e.content.decode()}"}
+    except YouTubeAPIError as e:
+        return {"error": f"YouTube API 오류: {e.status} {e.message}"}
     except Exception as e:
         return {"error": f"searchVideos 실행 중 알 수 없는 오류: {str(e)}"}
 
 @mcp.tool()
+@to_async
 def getVideoDetails(video_ids: List[str]) -> dict:
     """
     하나 이상의 video ID 목록을 받아, 해당 동영상들의 세부 정보(통계, 콘텐츠 세부정보 포함)를 반환합니다. (videos.list)
     :param video_ids: YouTube 비디오 ID의 리스트 (예: ["videoId1", "videoId2"])
     """
-    youtube = get_youtube_service()
-    if not youtube:
-        return {"error": "YOUTUBE_API_KEY가 설정되지 않았거나 서비스 초기화에 실패했습니다."}
-        
     try:
-        video_response = youtube.videos().list(
+        video_response = youtube_list(
+            "videos",
             part="snippet,contentDetails,statistics",
             id=",".join(video_ids) # API는 콤마로 구분된 문자열을 받음
-        ).execute()
+        )
         return video_response
-    except HttpError as e:
-        return {"error": f"YouTube API 오류: {e.resp.status} {e.content.decode()}"}
+    except YouTubeAPIError as e:
+        return {"error": f"YouTube API 오류: {e.status} {e.message}"}
     except Exception as e:
         return {"error": f"getVideoDetails 실행 중 알 수 없는 오류: {str(e)}"}
 
 @mcp.tool()
+@to_async
 def getVideoComments(video_id: str, max_results: int = 10) -> dict:
     """
     특정 YouTube 동영상의 댓글(최상위 댓글)을 검색합니다. (commentThreads.list)
     :param video_id: 댓글을 수집할 비디오의 ID
     :param max_results: 반환할 최대 댓글 수 (기본 10)
     """
-    youtube = get_youtube_service()
-    if not youtube:
-        return {"error": "YOUTUBE_API_KEY가 설정되지 않았거나 서비스 초기화에 실패했습니다."}
-        
     try:
-        comment_response = youtube.commentThreads().list(
+        comment_response = youtube_list(
+            "commentThreads",
             part="snippet",
             videoId=video_id,
             maxResults=max_results,
             textFormat="plainText",
             order="relevance" # 관련성 순 (또는 'time'으로 최신순)
-        ).execute()
+        )
         return comment_response
-    except HttpError as e:
+    except YouTubeAPIError as e:
         # 403 에러는 댓글이 비활성화된 경우가 많음
-        if e.resp.status == 403:
+        if e.status == 403:
             return {"error": "이 동영상은 댓글이 비활성화되어 있습니다.", "items": []}
-        return {"error": f"YouTube API 오류: {e.resp.status} {e.content.decode()}"}
+        return {"error": f"YouTube API 오류: {e.status} {e.message}"}
     except Exception as e:
         return {"error": f"getVideoComments 실행 중 알 수 없는 오류: {str(e)}"}
 
 @mcp.tool()
+@to_async
 def getTranscripts(video_id: str) -> dict:
     """
     YouTube 동영상의 자막(transcript)을 수집합니다. 한국어를 우선 시도하고, 없으면 영어로 대체합니다.
@@ -278,6 +363,80 @@ def getTranscripts(video_id: str) -> dict:
         # (예: TranscriptsDisabled, NoTranscriptFound, VideoUnavailable 등)
         return {"videoId": video_id, "error": f"자막을 가져올 수 없습니다: {str(e)}"}
 
+@mcp.tool()
+async def getVideoBundles(
+    video_ids: List[str],
+    max_comments: int = 10,
+    transcript_max_chars: int = 3000,
+    description_max_chars: int = 1000,
+    include_transcripts: bool = True,
+    include_comments: bool = True,
+) -> dict:
+    """
+    여러 YouTube 동영상의 세부 정보, 댓글, 자막을 한 번에 수집합니다.
+    세부 정보는 videos.list 한 번으로 가져오고, 댓글과 자막은 영상별로 동시에 수집합니다.
+    일부 항목이 실패해도 나머지 결과는 반환하며, 실패 내역은 'errors'에 담깁니다.
+    :param video_ids: YouTube 비디오 ID의 리스트 (예: ["videoId1", "videoId2"])
+    :param max_comments: 영상별 최대 댓글 수 (기본 10)
+    :param transcript_max_chars: 영상별 자막 최대 글자 수 (기본 3000)
+    :param description_max_chars: 영상 설명 최대 글자 수 (기본 1000)
+    :param include_transcripts: 자막 수집 여부
+    :param include_comments: 댓글 수집 여부
+    """
+    video_ids = list(dict.fromkeys(video_ids))  # 순서를 유지하며 중복 제거
+    if not video_ids:
+        return {"videos": [], "errors": []}
+
+    jobs = [run_blocking(getVideoDetails.__wrapped__, video_ids)]
+    if include_comments:
+        jobs += [run_blocking(getVideoComments.__wrapped__, video_id, max_comments) for video_id in video_ids]
+    if include_transcripts:
+        jobs += [run_blocking(getTranscripts.__wrapped__, video_id) for video_id in video_ids]
+    details, *per_video = await asyncio.gather(*jobs)
+    comments = per_video[:len(video_ids)] if include_comments else [None] * len(video_ids)
+    transcripts = per_video[-len(video_ids):] if include_transcripts else [None] * len(video_ids)
+
+    errors = []
+    details_by_id = {}
+    if details.get("error"):
+        errors.append({"videoId": None, "field": "details", "error": details["error"]})
+    else:
+        details_by_id = {item.get("id"): item for item in details.get("items", [])}
+
+    videos = []
+    for video_id, comment_result, transcript_result in zip(video_ids, comments, transcripts):
+        bundle = {"videoId": video_id}
+
+        detail = details_by_id.get(video_id)
+        if detail:
+            snippet = detail.get("snippet") or {}
+            bundle["title"] = snippet.get("title")
+            bundle["channelTitle"] = snippet.get("channelTitle")
+            bundle["publishedAt"] = snippet.get("publishedAt")
+            bundle["description"] = (snippet.get("description") or "")[:description_max_chars]
+            bundle["statistics"] = detail.get("statistics", {})
+            bundle["duration"] = (detail.get("contentDetails") or {}).get("duration")
+        elif not details.get("error"):
+            errors.append({"videoId": video_id, "field": "details", "error": "영상 정보를 찾을 수 없습니다."})
+
+        if comment_result is not None:
+            if comment_result.get("error"):
+                errors.append({"videoId": video_id, "field": "comments", "error": comment_result["error"]})
+            bundle["comments"] = [
+                ((item.get("snippet") or {}).get("topLevelComment") or {}).get("snippet", {}).get("textDisplay", "")
+                for item in comment_result.get("items", [])
+            ]
+
+        if transcript_result is not None:
+            if transcript_result.get("error"):
+                errors.append({"videoId": video_id, "field": "transcript", "error": transcript_result["error"]})
+            else:
+                bundle["transcript"] = transcript_result["transcript"][:transcript_max_chars]
+
+        videos.append(bundle)
+
+    return {"videos": videos, "errors": errors}
+
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
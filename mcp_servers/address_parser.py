@@ -0,0 +1,99 @@
+import re
+
+# 시/도 약칭 -> 정식 명칭
+SIDO_ALIASES = {
+    "서울": "서울특별시", "부산": "부산광역시", "대구": "대구광역시", "인천": "인천광역시",
+    "광주": "광주광역시", "대전": "대전광역시", "울산": "울산광역시", "세종": "세종특별자치시",
+    "경기": "경기도", "강원": "강원특별자치도", "충북": "충청북도", "충남": "충청남도",
+    "전북": "전북특별자치도", "전남": "전라남도", "경북": "경상북도", "경남": "경상남도",
+    "제주": "제주특별자치도",
+}
+SIDO_NAMES = set(SIDO_ALIASES.values()) | {"강원도", "전라북도", "제주도"}
+# 시군구 없이 바로 읍면동으로 나뉘는 시/도 (예: "세종특별자치시 조치원읍")
+SIDO_WITHOUT_SIGUNGU = {"세종특별자치시"}
+
+_SIGUNGU_PATTERN = re.compile(r"^[가-힣]+(시|군|구)$")
+_EMD_PATTERN = re.compile(r"^[가-힣0-9]+(동|읍|면|가|리)$")
+# 번호가 붙은 행정동 (예: "역삼1동", "상계10동") -> 번호 앞의 이름
+_NUMBERED_DONG_PATTERN = re.compile(r"^([가-힣]+)\d[가-힣0-9]*동$")
+
+def extract_region(address) -> dict:
+    """
+    주소 문자열에서 행정구역 이름을 추출합니다.
+    예: "서울 서대문구 대현동 11-1" -> {"sido": "서울특별시", "sigungu": "서대문구", "gu": "서대문구", "dong": "대현동"}
+    찾지 못한 항목은 None입니다.
+    """
+    if isinstance(address, dict):
+        address = address.get("address", "")
+    tokens = str(address or "").replace(",", " ").split()
+
+    region = {"sido": None, "sigungu": None, "gu": None, "dong": None}
+    for token in tokens:
+        if region["sido"] is None and (token in SIDO_ALIASES or token in SIDO_NAMES):
+            region["sido"] = SIDO_ALIASES.get(token, token)
+        elif region["dong"] is None and (region["sigungu"] or region["sido"] in SIDO_WITHOUT_SIGUNGU) and _EMD_PATTERN.match(token):
+            region["dong"] = token
+        elif region["dong"] is None and _SIGUNGU_PATTERN.match(token):
+            # "성남시 분당구"처럼 시와 구가 함께 있으면 시군구는 둘을 합치고, 구는 마지막 구를 사용합니다.
+            region["sigungu"] = f"{region['sigungu']} {token}" if region["sigungu"] else token
+            region["gu"] = token
+    return region
+
+def base_dong(name: str) -> str:
+    """번호가 붙은 행정동을 번호 없는 이름으로 바꿉니다. 예: "역삼1동" -> "역삼동" (그 외에는 그대로 반환)"""
+    numbered = _NUMBERED_DONG_PATTERN.match(name or "")
+    return f"{numbered.group(1)}동" if numbered else name
+
+def region_keywords(region: dict) -> list:
+    """지역 매칭에 사용할 키워드(구, 동 및 접미사를 뗀 이름)를 반환합니다."""
+    keywords = []
+    for name in (region.get("gu"), region.get("dong")):
+        if not name:
+            continue
+        keywords.append(name)
+        if base_dong(name) != name:
+            # 게시물은 보통 번호 없이 쓰므로 "역삼1동" -> "역삼동"도 키워드로 사용합니다.
+            name = base_dong(name)
+            keywords.append(name)
+        # "서대문구" -> "서대문", "대현동" -> "대현" (접미사를 뗀 이름이 두 글자 이상일 때만)
+        if len(name) > 2 and name[-1] in "구동" and not name[-2].isdigit():
+            keywords.append(name[:-1])
+    return keywords
+
+# 이보다 짧은 키워드(예: "중구", "동면", "우동")는 다른 지역이나 일반 단어와 겹치기 쉬워 단독으로는 인정하지 않습니다.
+MIN_STANDALONE_KEYWORD_LENGTH = 3
+
+def _parent_names(region: dict) -> set:
+    """짧은 키워드의 문맥으로 인정할 상위 지역 이름 (시도 정식/약칭, 시군구 및 접미사를 뗀 이름)"""
+    names = set()
+    sido = region.get("sido")
+    if sido:
+        names.add(sido)
+        names.update(alias for alias, full in SIDO_ALIASES.items() if full == sido)
+    for part in (region.get("sigungu") or "").split():
+        names.add(part)
+        if len(part) > 2:
+            names.add(part[:-1])
+    return names
+
+def match_region_keywords(text: str, region: dict) -> list:
+    """
+    텍스트에 언급된 지역 키워드(region_keywords) 목록을 반환합니다.
+    MIN_STANDALONE_KEYWORD_LENGTH보다 짧은 키워드는 단어 시작 위치에 나오고, 상위 지역 이름도 함께 언급된 경우에만 인정합니다.
+    예: "중구"는 "서울 중구에서 화재"에서는 인정하지만, "부산 중구"나 "집중구역"에서는 인정하지 않습니다.
+    """
+    text = text or ""
+    hits = []
+    parents = None
+    for keyword in region_keywords(region):
+        if len(keyword) >= MIN_STANDALONE_KEYWORD_LENGTH:
+            if keyword in text:
+                hits.append(keyword)
+            continue
+        if not re.search(rf"(?<![가-힣]){re.escape(keyword)}", text):
+            continue
+        if parents is None:
+            parents = _parent_names(region)
+        if any(name != keyword and name in text for name in parents):
+            hits.append(keyword)
+    return hits
@@ -0,0 +1,105 @@
+"""
+스크랩한 뉴스 기사 본문을 정규화된 URL 기준으로 저장하는 로컬 기사 저장소입니다.
+같은 기사를 여러 사용자가 요청해도 Firecrawl 스크랩(유료, 수 초 소요)은 신선도 기간 내에 한 번만 수행됩니다.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 상대 경로는 서버 프로세스의 작업 디렉터리가 아니라 프로젝트 루트 기준입니다.
+ARTICLE_STORE_PATH = os.path.abspath(os.path.join(
+    project_root,
+    os.getenv("ARTICLE_STORE_PATH", os.path.join("mcp_servers", "cache", "articles.sqlite")),
+))
+ARTICLE_MAX_AGE = int(os.getenv("ARTICLE_MAX_AGE", "86400"))  # 저장된 기사를 신선하다고 볼 기간 (초)
+
+# URL 정규화 시 제거할 추적용 쿼리 파라미터
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "from", "cmpid"}
+
+def normalize_url(url: str) -> str:
+    """
+    같은 기사를 가리키는 URL이 같은 키가 되도록 정규화합니다.
+    (스킴/호스트 소문자화, 프래그먼트 및 utm_* 등 추적 파라미터 제거, 쿼리 정렬, 끝 슬래시 제거)
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """정규화된 URL의 해시를 키로 기사 제목, 본문, 발행 시각을 저장하는 SQLite 저장소"""
+
+    def __init__(self, path: str = ARTICLE_STORE_PATH, max_age: int = ARTICLE_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS articles (
+                    url_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    body TEXT NOT NULL,
+                    published_at TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ 기사 저장소 파일을 열 수 없어 매번 새로 스크랩합니다: {e}", file=sys.stderr)
+            self._conn = None
+
+    def get(self, url: str):
+        """신선도 기간 내에 저장된 기사가 있으면 {title, body, published_at}을, 없으면 None을 반환합니다."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT title, body, published_at, fetched_at FROM articles WHERE url_key = ?", (url_key(url),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or time.time() - row[3] > self.max_age:
+            return None
+        return {"title": row[0], "body": row[1], "published_at": row[2]}
+
+    def put(self, url: str, extracted: dict):
+        """추출된 기사를 저장합니다. 본문이 없으면 저장하지 않습니다."""
+        if self._conn is None or not isinstance(extracted, dict) or not extracted.get("body"):
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO articles (url_key, url, title, body, published_at, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        url_key(url), normalize_url(url),
+                        extracted.get("title"), extracted["body"], extracted.get("published_at"),
+                        time.time(),
+                    ),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ 기사 저장 실패: {e}", file=sys.stderr)
+
+
+article_store = ArticleStore()
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+블로킹 I/O(requests, googleapiclient 등)를 사용하는 도구를 async 도구로 제공하기 위한 헬퍼입니다.
+FastMCP는 요청마다 별도의 태스크를 띄우므로, 도구 본문을 스레드 풀에서 실행하면 여러 사용자의 호출이 한 서버 프로세스 안에서 동시에 처리됩니다.
+"""
+
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_THREAD_POOL_SIZE = int(os.getenv("TOOL_THREAD_POOL_SIZE", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_THREAD_POOL_SIZE, thread_name_prefix="mcp-tool")
+
+async def run_blocking(func, *args, **kwargs):
+    """블로킹 함수를 공유 스레드 풀에서 실행하고 결과를 기다립니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def to_async(func):
+    """
+    동기 도구 함수를 스레드 풀에서 실행하는 async 함수로 감쌉니다.
+    functools.wraps로 시그니처와 docstring을 유지하므로 FastMCP의 도구 스키마는 그대로입니다.
+    원래의 동기 함수는 `.__wrapped__`로 접근할 수 있습니다.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
\ No newline at end of file
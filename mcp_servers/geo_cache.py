@@ -0,0 +1,114 @@
+"""
+좌표 -> 주소 변환(역지오코딩) 결과를 지오해시 셀 단위로 재사용하는 캐시입니다.
+같은 자리에서 다시 묻는 사용자나 가까이 있는 사용자들은 같은 셀에 속하므로 카카오 API를 다시 호출하지 않습니다.
+메모리 LRU와 SQLite 파일(TTL)을 함께 사용하므로 서버가 재시작되어도 캐시가 유지됩니다.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+GEOHASH_PRECISION = int(os.getenv("GEOHASH_PRECISION", "8"))           # 8자리 ≈ 38m x 19m 셀
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))      # 메모리 LRU 항목 수
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", "604800"))      # 주소 재사용 기간 (초)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 상대 경로는 서버 프로세스의 작업 디렉터리가 아니라 프로젝트 루트 기준입니다.
+GEOCODE_CACHE_PATH = os.path.abspath(os.path.join(
+    project_root,
+    os.getenv("GEOCODE_CACHE_PATH", os.path.join("mcp_servers", "cache", "geocode_cache.sqlite")),
+))
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """위도/경도를 지정한 자릿수의 지오해시 문자열로 변환합니다."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+class GeocodeCache:
+    """지오해시를 키로 주소를 저장하는 메모리 LRU + SQLite TTL 캐시"""
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH, max_size: int = GEOCODE_CACHE_SIZE, ttl: int = GEOCODE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._memory = OrderedDict()   # {geohash: (address, expires_at)}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS geocode_cache (geohash TEXT PRIMARY KEY, address TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 주소 캐시 파일을 열 수 없어 메모리 캐시만 사용합니다: {e}", file=sys.stderr)
+                self._conn = None
+
+    def _remember(self, geohash: str, address: str, expires_at: float):
+        self._memory[geohash] = (address, expires_at)
+        self._memory.move_to_end(geohash)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, geohash: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(geohash)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(geohash)
+                return entry[0]
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT address, expires_at FROM geocode_cache WHERE geohash = ?", (geohash,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if row and row[1] > now:
+                self._remember(geohash, row[0], row[1])
+                return row[0]
+        return None
+
+    def set(self, geohash: str, address: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(geohash, address, expires_at)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (geohash, address, expires_at) VALUES (?, ?, ?)",
+                    (geohash, address, expires_at),
+                )
+                self._conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 주소 캐시 저장 실패: {e}", file=sys.stderr)
+
+
+# 서버 프로세스 전역에서 공유하는 캐시 인스턴스
+geocode_cache = GeocodeCache()
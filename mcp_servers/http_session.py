@@ -0,0 +1,59 @@
+"""
+MCP 서버 도구가 공유하는 HTTP 세션 풀입니다.
+업스트림 호스트마다 keep-alive 세션을 하나씩 유지하여, 도구 호출마다 TCP/TLS 핸드셰이크를 반복하지 않습니다.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))            # 호스트별 최대 연결 수
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_sessions = {}
+_lock = threading.Lock()
+
+def _new_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # 재시도 후에도 실패하면 응답을 그대로 돌려주고 raise_for_status()에서 처리합니다.
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+def get_session(url: str) -> requests.Session:
+    """URL의 호스트에 해당하는 공유 세션을 반환합니다."""
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _lock:
+            session = _sessions.setdefault(host, _new_session())
+    return session
+
+def http_get(url: str, timeout=None, **kwargs) -> requests.Response:
+    """
+    호스트별 공유 세션으로 GET 요청을 보냅니다.
+    timeout을 숫자로 주면 읽기 타임아웃으로 사용하고, 연결 타임아웃은 HTTP_CONNECT_TIMEOUT을 사용합니다.
+    """
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    elif not isinstance(timeout, tuple):
+        timeout = (min(HTTP_CONNECT_TIMEOUT, timeout), timeout)
+    return get_session(url).get(url, timeout=timeout, **kwargs)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+사용자(또는 대화 스레드)별 최신 위치를 저장하는 위치 저장소입니다.
+위치 수집 웹 서버(broswer.py)가 쓰고 GPS MCP 서버가 읽으며, 두 프로세스가 같은 절대 경로의 파일을 사용합니다.
+- 쓰기: 임시 파일에 쓴 뒤 os.replace로 교체하므로 읽는 쪽이 쓰다 만 파일을 보지 않습니다.
+  읽기-수정-쓰기 구간은 잠금 파일(<저장 파일>.lock)로 프로세스 간에도 직렬화해, 동시에 저장한 위치가 유실되지 않게 합니다.
+- 읽기: 파일 내용을 메모리 색인에 두고, 파일 수정 시각(mtime)이 바뀐 경우에만 다시 읽습니다.
+- 보존: LOCATION_RETENTION_SEC보다 오래된 위치는 저장 시 정리하고, LOCATION_MAX_AGE_SEC보다 오래된 위치는 만료로 처리합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 프로세스 내 잠금만 사용합니다.
+    fcntl = None
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOCATION_STORE_PATH = os.path.abspath(os.path.join(
+    project_root,
+    os.getenv("LOCATION_STORE_PATH", os.path.join("mcp_servers", "cache", "locations.json")),
+))
+LOCATION_MAX_AGE_SEC = int(os.getenv("LOCATION_MAX_AGE_SEC", "86400"))        # 이보다 오래된 위치는 만료
+LOCATION_RETENTION_SEC = int(os.getenv("LOCATION_RETENTION_SEC", "604800"))   # 이보다 오래된 위치는 삭제
+
+# 사용자 ID 없이 저장된 위치 (위치 수집 페이지를 user_id 없이 연 경우)
+DEFAULT_USER_ID = "default"
+
+
+class LocationStore:
+    """사용자 ID -> {latitude, longitude, accuracy, id, updated_at} 위치 저장소"""
+
+    def __init__(self, path: str = LOCATION_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index = {}
+        self._mtime = None
+
+    def _refresh(self):
+        """파일이 바뀐 경우에만 메모리 색인을 다시 읽습니다. (self._lock 안에서 호출)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._index, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._index = json.load(f).get("users", {})
+            self._mtime = mtime
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            print(f"⚠️ 위치 저장소를 읽을 수 없습니다: {e}", file=sys.stderr)
+
+    @contextmanager
+    def _file_lock(self):
+        """저장 파일 옆의 잠금 파일에 배타적 잠금을 겁니다. (브라우저 서버, GPS 서버 등 여러 프로세스 사이의 쓰기 직렬화)"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def get(self, user_id: str):
+        """
+        사용자의 최신 위치를 반환합니다.
+        반환: (위치 dict, None) 또는 (None, 실패 사유)
+        """
+        with self._lock:
+            self._refresh()
+            location = self._index.get(user_id)
+        if location is None:
+            return None, "not_found"
+        if time.time() - location.get("updated_at", 0) > LOCATION_MAX_AGE_SEC:
+            return None, "expired"
+        return location, None
+
+    def save(self, user_id: str, location: dict) -> dict:
+        """사용자 위치를 저장하고, 보존 기간이 지난 위치를 정리한 뒤 파일을 원자적으로 교체합니다."""
+        now = time.time()
+        entry = {**location, "updated_at": now}
+        with self._lock, self._file_lock():
+            # 다른 프로세스가 방금 쓴 내용을 놓치지 않도록 잠금을 잡은 뒤 파일을 항상 다시 읽습니다.
+            self._mtime = None
+            self._refresh()
+            index = {
+                uid: value for uid, value in self._index.items()
+                if now - value.get("updated_at", 0) <= LOCATION_RETENTION_SEC
+            }
+            index[user_id] = entry
+
+            directory = os.path.dirname(self.path)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".locations-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"users": index}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._index = index
+            self._mtime = os.stat(self.path).st_mtime_ns
+        return entry
+
+
+# 프로세스 전역에서 공유하는 위치 저장소
+location_store = LocationStore()
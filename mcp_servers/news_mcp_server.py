@@ -2,12 +2,12 @@
 
 import os
 import json
+import asyncio
 import requests
-import urllib3
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List
 from firecrawl import Firecrawl
 
 # --- 경로 설정 및 .env 로드 ---
@@ -15,14 +15,22 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 dotenv_path = os.path.join(project_root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
+# 아래 헬퍼 모듈은 import 시점에 환경 변수를 읽으므로 .env를 로드한 뒤 import합니다.
+from async_utils import to_async, run_blocking
+from disaster_ingest import query_source, clamp_rows, DISASTER_QUERY_ROWS
+from http_session import http_get
+from tool_cache import tool_cache
+from article_store import article_store, normalize_url, ARTICLE_MAX_AGE
+
 mcp = FastMCP("news_mcp_server")
 
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 
 # --- 기존 도구 (get_naver_news) ---
 @mcp.tool()
+@to_async
 def get_naver_news(query: str, display: int = 10, start: int = 1, sort: str = "sim") -> dict:
-    """네이버 검색 API를 사용하여 뉴스를 검색합니다."""
+    """네이버 검색 API를 사용하여 뉴스를 검색합니다. (같은 검색 조건의 결과는 TOOL_CACHE_TTL 동안 사용자 간에 공유)"""
     url = "https://openapi.naver.com/v1/search/news.json"
     params = {'query': query, 'display': display, 'start': start, 'sort': sort}
     headers = {
@@ -33,83 +41,66 @@ def get_naver_news(query: str, display: int = 10, start: int = 1, sort: str = "s
     if not headers['X-Naver-Client-Id'] or not headers['X-Naver-Client-Secret']:
         return {'status': 'error', 'message': '네이버 API 키가 .env 파일에 설정되지 않았습니다.'}
 
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {'status': 'error', 'message': str(e)}
-
-# --- 기존 도구 (get_yonhap_news) ---
-@mcp.tool()
-def get_yonhap_news() -> dict:
-    """연합 뉴스를 검색합니다 (공공데이터포털)"""
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    
-    url = "https://www.safetydata.go.kr/V2/api/DSSP-IF-00051"
-    serviceKey = os.getenv("YONHAP_NEWS_API_KEY")
-    if not serviceKey:
-        return {'status': 'error', 'message': '연합뉴스 API 키가 .env 파일에 설정되지 않았습니다.'}
-        
-    inquiry_date = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-    
-    payloads = {
-        "serviceKey": serviceKey,
-        "returnType": "json",
-        "pageNo": "1",
-        "numOfRows": "5",
-        "inqDt": inquiry_date
-    }
+    def fetch():
+        try:
+            response = http_get(url, params=params, headers=headers, timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            return {'status': 'error', 'message': str(e)}
 
-    try:
-        response = requests.get(url, params=payloads, verify=False, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {'status': 'error', 'message': str(e)}
+    # 오류 응답은 캐시하지 않습니다.
+    return tool_cache.get_or_fetch(url, params, fetch, is_cacheable=lambda result: result.get('status') != 'error')
 
-# --- (신규) Serper.dev 뉴스 검색 도구 ---
+# --- 기존 도구 (get_yonhap_news) ---
 @mcp.tool()
-def scrape(url: str) -> str:
+@to_async
+def get_yonhap_news(numOfRows: int = DISASTER_QUERY_ROWS) -> dict:
+    """연합 뉴스를 검색합니다 (공공데이터포털). 최신 기사부터 numOfRows건을 반환합니다."""
+    # 재난 데이터 수집기가 전체 페이지를 로컬 저장소에 쌓아두므로 저장소에서 응답합니다.
+    return query_source("yonhap_news", clamp_rows(numOfRows))
+
+# --- Firecrawl 기사 스크랩 ---
+# 최소 JSON 스키마 (Pydantic 불필요)
+ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": ["string", "null"]},
+        "published_at": {"type": ["string", "null"]},
+        "body": {"type": "string"},
+        "paragraphs": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["body"]
+}
+
+ARTICLE_GUARDRAIL = (
+    "Return ONLY the news article's main body as JSON. "
+    "Preserve original order and line breaks. "
+    "Do NOT summarize, translate, or add text. "
+    "Exclude headers, nav, footers, sidebars, ads, sponsored/related boxes, "
+    "comments, author bio, newsletter/subscription, and paywalls. "
+    "If title or published date are not obvious, set them to null."
+)
+
+@lru_cache(maxsize=1)
+def get_firecrawl_client() -> Firecrawl:
+    """Firecrawl 클라이언트를 프로세스당 한 번만 만들어 재사용합니다."""
+    return Firecrawl(api_key=FIRECRAWL_API_KEY)
+
+def _scrape_article(url: str) -> dict:
     """
-    뉴스 기사 본문만 JSON으로 추출 (가장 단순/안정 버전).
+    기사 저장소를 먼저 확인하고, 없거나 오래된 경우에만 Firecrawl로 스크랩해 저장합니다.
     - DOM 1차 필터: only_main_content / include_tags / exclude_tags
     - LLM 2차 정제: JSON 포맷 + 간단 스키마 + 가드레일 프롬프트
-    - 항상 문자열(JSON)로 반환하여 MCP 호환
     """
-    if not FIRECRAWL_API_KEY:
-        return json.dumps(
-            {"status": "error", "message": "FIRECRAWL_API_KEY가 .env 파일에 없습니다."},
-            ensure_ascii=False, indent=2
-        )
+    stored = article_store.get(url)
+    if stored is not None:
+        return {"status": "ok", "url": url, "cached": True, "extracted": stored}
 
     try:
-        firecrawl = Firecrawl(api_key=FIRECRAWL_API_KEY)
-
-        # 최소 JSON 스키마 (Pydantic 불필요)
-        schema = {
-            "type": "object",
-            "properties": {
-                "title": {"type": ["string", "null"]},
-                "published_at": {"type": ["string", "null"]},
-                "body": {"type": "string"},
-                "paragraphs": {"type": "array", "items": {"type": "string"}}
-            },
-            "required": ["body"]
-        }
-
-        guardrail = (
-            "Return ONLY the news article's main body as JSON. "
-            "Preserve original order and line breaks. "
-            "Do NOT summarize, translate, or add text. "
-            "Exclude headers, nav, footers, sidebars, ads, sponsored/related boxes, "
-            "comments, author bio, newsletter/subscription, and paywalls. "
-            "If title or published date are not obvious, set them to null."
-        )
-
-        doc = firecrawl.scrape(
+        doc = get_firecrawl_client().scrape(
             url=url,
-            formats=[{"type": "json", "schema": schema, "prompt": guardrail}],
+            formats=[{"type": "json", "schema": ARTICLE_SCHEMA, "prompt": ARTICLE_GUARDRAIL}],
             # ↓↓↓ 파이썬 SDK는 스네이크 케이스 ↓↓↓
             only_main_content=True,
             include_tags=["article", "main"],
@@ -120,24 +111,60 @@ def scrape(url: str) -> str:
                 ".comments", "#comments",
                 ".newsletter", ".subscription", ".paywall"
             ],
-            # 캐시 무시하고 최신이 필요하면 0, 아니면 생략
-            max_age=0
+            # 기사 저장소와 같은 신선도 기준으로 Firecrawl 측 캐시도 허용합니다. (밀리초)
+            max_age=ARTICLE_MAX_AGE * 1000
             # 필요 시 위치/언어도 가능: location={"country":"KR","languages":["ko","en"]}
         )
+    except Exception as e:
+        return {"status": "error", "url": url, "message": f"Firecrawl 스크래핑 중 예외 발생: {e}"}
 
-        result = {
-            "status": "ok",
-            "url": url,
-            "extracted": getattr(doc, "json", None)  # 본문은 여기로 반환됨
-        }
-        return json.dumps(result, ensure_ascii=False, indent=2)
+    extracted = getattr(doc, "json", None)  # 본문은 여기로 반환됨
+    article_store.put(url, extracted)
+    return {"status": "ok", "url": url, "cached": False, "extracted": extracted}
 
-    except Exception as e:
+@mcp.tool()
+@to_async
+def scrape(url: str) -> str:
+    """
+    뉴스 기사 본문만 JSON으로 추출 (가장 단순/안정 버전).
+    - 이미 스크랩한 기사는 로컬 기사 저장소에서 바로 반환
+    - 항상 문자열(JSON)로 반환하여 MCP 호환
+    """
+    if not FIRECRAWL_API_KEY:
         return json.dumps(
-            {"status": "error", "message": f"Firecrawl 스크래핑 중 예외 발생: {e}"},
+            {"status": "error", "message": "FIRECRAWL_API_KEY가 .env 파일에 없습니다."},
+            ensure_ascii=False, indent=2
+        )
+    return json.dumps(_scrape_article(url), ensure_ascii=False, indent=2)
+
+@mcp.tool()
+async def scrape_batch(urls: List[str]) -> str:
+    """
+    여러 뉴스 기사 본문을 한 번에 추출합니다.
+    - 같은 기사를 가리키는 URL은 한 번만 스크랩
+    - 기사 저장소에 없는 기사만 Firecrawl로 동시에 스크랩
+    - 결과는 입력 순서대로 {"status": "ok", "results": [...]} 형태의 JSON 문자열로 반환
+    """
+    if not FIRECRAWL_API_KEY:
+        return json.dumps(
+            {"status": "error", "message": "FIRECRAWL_API_KEY가 .env 파일에 없습니다."},
             ensure_ascii=False, indent=2
         )
 
+    unique_urls = {}
+    for url in urls:
+        unique_urls.setdefault(normalize_url(url), url)
+
+    scraped = await asyncio.gather(*(run_blocking(_scrape_article, url) for url in unique_urls.values()))
+    by_key = dict(zip(unique_urls.keys(), scraped))
+    results = []
+    seen = set()
+    for url in urls:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            results.append(by_key[key])
+    return json.dumps({"status": "ok", "results": results}, ensure_ascii=False, indent=2)
 
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -1,7 +1,6 @@
 import os
-import requests
-import urllib3
-from datetime import datetime, timedelta
+import threading
+from typing import Optional
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
@@ -10,56 +9,91 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 dotenv_path = os.path.join(project_root, '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
+# 아래 헬퍼 모듈은 import 시점에 환경 변수를 읽으므로 .env를 로드한 뒤 import합니다.
+from async_utils import to_async
+from disaster_ingest import (
+    query_source, get_store, current_state, start_background_poller, clamp_rows,
+    DISASTER_INGEST_IN_SERVER, DISASTER_QUERY_ROWS,
+)
+from region_index import RegionIndex
+
 mcp = FastMCP("disaster_mcp_server") 
 
-def fetch_safety_data(url: str, service_key: str, params: dict) -> dict:
-    """공공데이터포털 API 요청을 처리하는 공통 함수"""
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# 도구는 로컬 재난 데이터 저장소에서 최신순으로 numOfRows건을 응답하고, 저장소는 백그라운드 수집기가 주기적으로 갱신합니다.
+# (저장소가 비었거나 오래된 경우에는 조회 시점에 즉시 수집합니다.)
+@mcp.tool()
+@to_async
+def getDisasterMessage(numOfRows: int = DISASTER_QUERY_ROWS) -> dict:
+    """긴급 재난 문자 정보를 수집합니다. 최신 문자부터 numOfRows건을 반환합니다."""
+    return query_source("disaster_message", clamp_rows(numOfRows))
+
+@mcp.tool()
+@to_async
+def getForestFires(numOfRows: int = DISASTER_QUERY_ROWS) -> dict:
+    """산불 정보를 수집합니다. 최신 정보부터 numOfRows건을 반환합니다."""
+    return query_source("forest_fires", clamp_rows(numOfRows))
+
+@mcp.tool()
+@to_async
+def getKMAWeatherWarning(numOfRows: int = DISASTER_QUERY_ROWS) -> dict:
+    """기상청 기상 재난 특보 정보를 수집합니다. 최신 특보부터 numOfRows건을 반환합니다."""
+    return query_source("kma_weather_warning", clamp_rows(numOfRows))
 
-    if not service_key:
-        return {'resultCode': '99', 'resultMsg': 'API 서비스 키가 설정되지 않았습니다.'}
+# 위치 기반 조회 대상 소스 (기상특보는 지역 단위가 넓어 전체를 그대로 사용합니다)
+NEARBY_SOURCES = ("disaster_message", "forest_fires")
 
-    base_payloads = {
-        "serviceKey": service_key,
-        "returnType": "json",
-        "pageNo": "1",
-        "numOfRows": "5",
-    }
-    base_payloads.update(params)
+# 소스별 지역 색인: {소스: ((조회 시작일, 수집 시각, 행 수), RegionIndex)} — 저장소가 갱신될 때만 다시 만듭니다.
+_region_indexes = {}
+_region_lock = threading.Lock()
 
-    try:
-        response = requests.get(url, params=base_payloads, verify=False, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        return {'resultCode': '99', 'resultMsg': f'API 요청 실패: {e}'}
+def get_region_index(source: str):
+    """(RegionIndex, None) 또는 수집 실패 시 (None, 오류 응답)을 반환합니다. 저장소가 오래되었으면 갱신을 기다리지 않고 기존 행을 사용합니다."""
+    state, error = current_state(source)
+    if error is not None:
+        return None, error
+    store = get_store()
+    key = (state["start_date"], state["polled_at"], store.count(source, state["start_date"]))
+    cached = _region_indexes.get(source)
+    if cached and cached[0] == key:
+        return cached[1], None
 
-@mcp.tool()
-def getDisasterMessage() -> dict:
-    """긴급 재난 문자 정보를 수집합니다."""
-    url = "https://www.safetydata.go.kr/V2/api/DSSP-IF-00247"
-    service_key = os.getenv("DISASTER_MESSAGE_API_KEY")
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-    params = {"crtDt": yesterday}
-    return fetch_safety_data(url, service_key, params)
+    index = RegionIndex(store.rows(source, state["start_date"]))
+    with _region_lock:
+        _region_indexes[source] = (key, index)
+    return index, None
 
 @mcp.tool()
-def getForestFires() -> dict:
-    """산불 정보를 수집합니다."""
-    url = "https://www.safetydata.go.kr/V2/api/DSSP-IF-10346"
-    service_key = os.getenv("FOREST_FIRES_API_KEY")
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-    params = {"startDt": yesterday}
-    return fetch_safety_data(url, service_key, params)
+@to_async
+def getNearbyDisasterEvents(
+    address: str = "",
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius_km: float = 20.0,
+) -> dict:
+    """
+    사용자 주소(시도/시군구/읍면동) 또는 좌표 반경에 해당하는 긴급 재난 문자와 산불 정보만 반환합니다.
+    각 행의 _match에 매칭 근거(level: sido/sigungu/dong/radius, distance_km)가 포함됩니다.
+    """
+    if not address and (latitude is None or longitude is None):
+        return {'resultCode': '99', 'resultMsg': '주소 또는 좌표(latitude, longitude)가 필요합니다.'}
 
-@mcp.tool()
-def getKMAWeatherWarning() -> dict:
-    """기상청 기상 재난 특보 정보를 수집합니다."""
-    url = "https://www.safetydata.go.kr/V2/api/DSSP-IF-00044"
-    service_key = os.getenv("KMA_WEATHER_API_KEY")
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
-    params = {"inqDt": yesterday}
-    return fetch_safety_data(url, service_key, params)
+    results = {}
+    for source in NEARBY_SOURCES:
+        index, error = get_region_index(source)
+        if error is not None:
+            results[source] = error
+            continue
+        rows = index.nearby(address, latitude, longitude, radius_km)
+        results[source] = {
+            "header": {"resultCode": "00", "resultMsg": "NORMAL SERVICE"},
+            "source": "local_store",
+            "totalCount": len(rows),
+            "scannedCount": len(index.rows),
+            "body": rows,
+        }
+    return {"address": address, "radius_km": radius_km, "results": results}
 
 if __name__ == "__main__":
+    if DISASTER_INGEST_IN_SERVER:
+        start_background_poller()
     mcp.run(transport="stdio")
\ No newline at end of file
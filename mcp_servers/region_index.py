@@ -0,0 +1,118 @@
+"""
+재난 이벤트(긴급재난문자, 산불)를 행정구역(시도/시군구/읍면동)과 좌표로 색인해, 사용자 위치와 관련된 이벤트만 골라냅니다.
+- 행정구역: 시도 -> 시군구 -> 읍면동 중첩 딕셔너리. 상위 지역 전체 대상 이벤트(예: "서울특별시 전체")는 하위 지역 사용자에게도 매칭됩니다.
+- 좌표: 좌표가 있는 이벤트는 NumPy 배열로 보관하고, 하버사인 거리를 한 번에 계산해 반경 내 이벤트를 가까운 순으로 반환합니다.
+"""
+
+import numpy as np
+
+# 주소 파싱은 에이전트와 같은 모듈(address_parser)을 사용합니다.
+from address_parser import extract_region, base_dong
+
+EARTH_RADIUS_KM = 6371.0088
+
+# 행에서 지역명을 읽을 필드 (앞에서부터 우선). 없으면 행의 모든 문자열을 이어 붙여 추출합니다.
+REGION_FIELDS = ("RCPTN_RGN_NM", "ADDR", "ADDRESS", "LOCATION")
+# 좌표 필드 후보 (위도, 경도)
+COORD_FIELDS = (("LAT", "LOT"), ("LA", "LO"), ("YCRD", "XCRD"), ("latitude", "longitude"), ("lat", "lon"), ("lat", "lng"))
+
+def _row_regions(row: dict) -> list:
+    """행의 대상 지역 목록을 반환합니다. 여러 지역이 쉼표로 나열된 경우 각각 추출합니다."""
+    for field in REGION_FIELDS:
+        if row.get(field):
+            texts = str(row[field]).split(",")
+            break
+    else:
+        texts = [" ".join(str(value) for value in row.values() if isinstance(value, str))]
+    regions = [extract_region(text) for text in texts]
+    return [region for region in regions if region["sido"]]
+
+def _row_coords(row: dict):
+    for lat_field, lon_field in COORD_FIELDS:
+        try:
+            lat, lon = float(row[lat_field]), float(row[lon_field])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lon <= 180 and (lat, lon) != (0.0, 0.0):
+            return lat, lon
+    return None
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """한 지점과 여러 지점 사이의 하버사인 거리(km)를 벡터 연산으로 계산합니다."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class RegionIndex:
+    """한 소스의 이벤트 행들에 대한 행정구역 + 좌표 색인"""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self._tree = {}   # {시도: {시군구 또는 None: {읍면동 또는 None: [행 번호]}}}
+        coord_ids, lats, lons = [], [], []
+        for index, row in enumerate(rows):
+            for region in _row_regions(row):
+                # 재난 문자는 "역삼동", 주소는 "역삼1동"처럼 쓰는 경우가 많아 번호 없는 동 이름으로 색인합니다.
+                (self._tree.setdefault(region["sido"], {})
+                    .setdefault(region["sigungu"], {})
+                    .setdefault(base_dong(region["dong"]), [])
+                    .append(index))
+            coords = _row_coords(row)
+            if coords:
+                coord_ids.append(index)
+                lats.append(coords[0])
+                lons.append(coords[1])
+        self._coord_ids = np.array(coord_ids, dtype=np.int64)
+        self._lats = np.array(lats, dtype=np.float64)
+        self._lons = np.array(lons, dtype=np.float64)
+
+    def match_region(self, region: dict) -> dict:
+        """
+        사용자 지역에 해당하는 이벤트를 {행 번호: 매칭 수준}으로 반환합니다.
+        매칭 수준: "sido"(시도 전체 대상), "sigungu", "dong"
+        """
+        matches = {}
+        by_sigungu = self._tree.get(region.get("sido"), {})
+        if not by_sigungu:
+            return matches
+
+        # "성남시 분당구" 사용자는 "성남시" 전체 대상 이벤트에도 매칭됩니다.
+        user_sigungu = region.get("sigungu") or ""
+        parts = user_sigungu.split()
+        candidates = [None] + [" ".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        user_dong = base_dong(region.get("dong"))
+        for sigungu in candidates:
+            for dong, ids in by_sigungu.get(sigungu, {}).items():
+                if dong is not None and user_dong not in (None, dong):
+                    continue
+                level = "dong" if dong else ("sigungu" if sigungu else "sido")
+                for index in ids:
+                    matches.setdefault(index, level)
+        return matches
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> list:
+        """반경 내 좌표를 가진 이벤트를 [(행 번호, 거리 km)]로 가까운 순으로 반환합니다."""
+        if self._coord_ids.size == 0:
+            return []
+        distances = haversine_km(latitude, longitude, self._lats, self._lons)
+        inside = np.nonzero(distances <= radius_km)[0]
+        order = inside[np.argsort(distances[inside])]
+        return [(int(self._coord_ids[i]), round(float(distances[i]), 2)) for i in order]
+
+    def nearby(self, address: str = None, latitude: float = None, longitude: float = None, radius_km: float = 20.0) -> list:
+        """
+        주소의 행정구역 또는 좌표 반경에 해당하는 이벤트 행을 반환합니다.
+        각 행에는 매칭 근거(_match: {"level": ..., "distance_km": ...})가 추가됩니다. 거리순, 이후 원래 순서입니다.
+        """
+        found = {}
+        if latitude is not None and longitude is not None:
+            for index, distance in self.within_radius(latitude, longitude, radius_km):
+                found[index] = {"level": "radius", "distance_km": distance}
+        if address:
+            for index, level in self.match_region(extract_region(address)).items():
+                found.setdefault(index, {"level": level})
+
+        ordered = sorted(found.items(), key=lambda item: (item[1].get("distance_km", float("inf")), item[0]))
+        return [{**self.rows[index], "_match": match} for index, match in ordered]
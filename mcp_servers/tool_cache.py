@@ -0,0 +1,116 @@
+"""
+MCP 서버 도구 결과를 사용자 간에 공유하는 TTL 캐시입니다.
+메모리 캐시와 SQLite 파일을 함께 사용하므로, 서버가 재시작되거나 여러 세션(프로세스)이 떠 있어도 캐시가 유지됩니다.
+공공 재난 데이터/연합뉴스는 재난 데이터 수집기(disaster_ingest)의 로컬 저장소가 대신하므로,
+이 캐시는 같은 지역의 사용자들이 같은 검색어로 호출하는 뉴스/SNS 검색(네이버 뉴스, YouTube 검색)에 사용합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOL_CACHE_TTL = int(os.getenv("TOOL_CACHE_TTL", "300"))
+# 상대 경로는 서버 프로세스의 작업 디렉터리가 아니라 프로젝트 루트 기준입니다.
+TOOL_CACHE_PATH = os.path.abspath(os.path.join(
+    project_root,
+    os.getenv("TOOL_CACHE_PATH", os.path.join("mcp_servers", "cache", "tool_cache.sqlite")),
+))
+
+# 캐시 키에서 제외할 파라미터 (인증 정보)
+SECRET_PARAMS = {"serviceKey", "access_token", "key", "developerKey"}
+
+
+class TTLCache:
+    """(endpoint, params, 시간 구간)을 키로 하는 메모리 + SQLite TTL 캐시"""
+
+    def __init__(self, path: str = TOOL_CACHE_PATH, ttl: int = TOOL_CACHE_TTL):
+        self.ttl = ttl
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tool_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 도구 캐시 파일을 열 수 없어 메모리 캐시만 사용합니다: {e}", file=sys.stderr)
+                self._conn = None
+
+    def make_key(self, endpoint: str, params: dict = None, ttl: int = None) -> str:
+        """endpoint, 파라미터(인증 정보 제외), 현재 시간 구간으로 캐시 키를 만듭니다."""
+        ttl = ttl or self.ttl
+        public_params = {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+        bucket = int(time.time() // ttl) if ttl > 0 else 0
+        raw = json.dumps([endpoint, public_params, bucket], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row and row[1] > now:
+            value = json.loads(row[0])
+            with self._lock:
+                self._memory[key] = (value, row[1])
+            return value
+        return None
+
+    def set(self, key: str, value, ttl: int = None):
+        expires_at = time.time() + (ttl or self.ttl)
+        with self._lock:
+            now = time.time()
+            self._memory = {k: entry for k, entry in self._memory.items() if entry[1] > now}
+            self._memory[key] = (value, expires_at)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tool_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at),
+                )
+                # 만료된 항목 정리
+                self._conn.execute("DELETE FROM tool_cache WHERE expires_at <= ?", (now,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 도구 캐시 저장 실패: {e}", file=sys.stderr)
+
+    def get_or_fetch(self, endpoint: str, params: dict, fetch, is_cacheable=lambda value: True, ttl: int = None):
+        """
+        캐시에 값이 있으면 반환하고, 없으면 fetch()를 호출해 결과를 저장합니다.
+        is_cacheable(value)가 False인 결과(오류 응답 등)는 저장하지 않습니다.
+        """
+        if (ttl or self.ttl) <= 0:
+            return fetch()
+        key = self.make_key(endpoint, params, ttl)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = fetch()
+        if is_cacheable(value):
+            self.set(key, value, ttl)
+        return value
+
+
+# 서버 프로세스 전역에서 공유하는 캐시 인스턴스
+tool_cache = TTLCache()
\ No newline at end of file
@@ -1,17 +1,93 @@
 import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import chromadb
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from config import RAG_DOCUMENTS_PATH, CHROMA_DB_PATH, OPENAI_API_KEY
+from rag.lexical_index import LexicalIndex
+from config import (
+    RAG_DOCUMENTS_PATH, CHROMA_DB_PATH, OPENAI_API_KEY,
+    RAG_COLLECTION_NAME, RAG_MANIFEST_PATH, RAG_LEXICAL_INDEX_PATH, VECTOR_BACKEND, RAG_EMBED_BATCH_SIZE, RAG_EMBED_CONCURRENCY, RAG_EMBED_MAX_RETRIES,
+    FAISS_DOCSTORE_PATH,
+)
 
-def build_and_save_vector_store():
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _chunk_id(source: str, text: str) -> str:
+    """청크 ID: 문서 경로와 청크 내용의 해시. 내용이 같으면 다시 빌드해도 ID가 같습니다."""
+    return _sha256(f"{source}\n{text}")
+
+def load_manifest() -> dict:
+    """이전 빌드의 문서/청크 해시 목록을 읽습니다. 없으면 빈 매니페스트를 반환합니다."""
+    try:
+        with open(RAG_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"index_version": None, "documents": {}}
+
+def _save_manifest(manifest: dict):
+    tmp_path = f"{RAG_MANIFEST_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, RAG_MANIFEST_PATH)
+
+def _embed_with_retry(embedding_model, texts: list) -> list:
+    for attempt in range(RAG_EMBED_MAX_RETRIES + 1):
+        try:
+            return embedding_model.embed_documents(texts)
+        except Exception as e:
+            if attempt == RAG_EMBED_MAX_RETRIES:
+                raise
+            wait = 2 ** attempt
+            print(f"⚠️ 임베딩 요청 실패, {wait}초 후 재시도합니다: {e}")
+            time.sleep(wait)
+
+def _embed_and_store(collection, embedding_model, chunks: list):
+    """
+    청크들을 배치로 나눠 동시에 임베딩하고, 배치가 끝날 때마다 바로 컬렉션에 저장합니다.
+    중간에 실패해도 저장된 배치는 남아 있으므로, 다시 실행하면 나머지 청크만 임베딩합니다.
+    """
+    batches = [chunks[i:i + RAG_EMBED_BATCH_SIZE] for i in range(0, len(chunks), RAG_EMBED_BATCH_SIZE)]
+    failures = []
+    with ThreadPoolExecutor(max_workers=RAG_EMBED_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(_embed_with_retry, embedding_model, [chunk["text"] for chunk in batch]): batch
+            for batch in batches
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            batch = futures[future]
+            try:
+                embeddings = future.result()
+            except Exception as e:
+                failures.append(e)
+                continue
+            collection.upsert(
+                ids=[chunk["id"] for chunk in batch],
+                embeddings=embeddings,
+                documents=[chunk["text"] for chunk in batch],
+                metadatas=[chunk["metadata"] for chunk in batch],
+            )
+            print(f"  - 배치 {done}/{len(batches)} 저장 완료 ({len(batch)}개 청크)")
+    if failures:
+        raise RuntimeError(f"{len(failures)}개 배치의 임베딩에 실패했습니다. 다시 실행하면 남은 청크만 임베딩합니다: {failures[0]}")
+
+def build_and_save_vector_store(full_rebuild: bool = False):
     """
     지정된 디렉토리의 텍스트 파일을 로드하여 ChromaDB 벡터 스토어를 생성하고 저장합니다.
+    문서/청크 내용 해시를 매니페스트로 관리하여, 새로 추가되거나 바뀐 청크만 임베딩하고 삭제된 청크의 벡터는 지웁니다.
+    full_rebuild=True이면 기존 컬렉션을 비우고 모든 청크를 다시 임베딩합니다.
     """
     if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
-    
+
     print(f"1. '{RAG_DOCUMENTS_PATH}' 디렉토리에서 텍스트 파일을 로드합니다...")
     loader = DirectoryLoader(
         RAG_DOCUMENTS_PATH,
@@ -25,21 +101,83 @@ def build_and_save_vector_store():
         return
     print(f"총 {len(docs)}개의 문서를 로드했습니다.\n")
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    print("2. 텍스트를 청크 단위로 분할합니다...")
-    splits = text_splitter.split_documents(docs)
-    print(f"총 {len(splits)}개의 청크로 분할되었습니다.\n")
+    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    if full_rebuild:
+        try:
+            client.delete_collection(RAG_COLLECTION_NAME)
+        except Exception:
+            pass
+    # langchain_chroma와 같은 컬렉션을 사용합니다. 임베딩은 직접 계산하므로 embedding_function은 지정하지 않습니다.
+    collection = client.get_or_create_collection(RAG_COLLECTION_NAME, embedding_function=None)
+    previous = load_manifest()
+    if full_rebuild or (previous.get("chunk_size"), previous.get("chunk_overlap")) != (CHUNK_SIZE, CHUNK_OVERLAP):
+        previous = {"index_version": None, "documents": {}}
+    existing_ids = set(collection.get(include=[])["ids"])
+
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    print("2. 바뀐 문서만 청크 단위로 분할합니다...")
+    documents = {}
+    wanted_ids = set()
+    new_chunks = []
+    for doc in docs:
+        source = doc.metadata["source"]
+        doc_hash = _sha256(doc.page_content)
+        old_entry = previous["documents"].get(source)
+        # 내용이 같고 모든 청크가 컬렉션에 남아 있는 문서는 분할도 건너뜁니다.
+        if old_entry and old_entry["hash"] == doc_hash and existing_ids.issuperset(old_entry["chunks"]):
+            documents[source] = old_entry
+            wanted_ids.update(old_entry["chunks"])
+            continue
+        chunk_ids = []
+        for split in text_splitter.split_documents([doc]):
+            chunk_id = _chunk_id(source, split.page_content)
+            if chunk_id in wanted_ids:
+                continue
+            chunk_ids.append(chunk_id)
+            wanted_ids.add(chunk_id)
+            # 컬렉션에 이미 있는 청크는 다시 임베딩하지 않습니다. (이전 실행이 중간에 실패했을 때도 이어서 진행)
+            if chunk_id not in existing_ids:
+                new_chunks.append({
+                    "id": chunk_id,
+                    "text": split.page_content,
+                    "metadata": {**split.metadata, "doc_hash": doc_hash},
+                })
+        documents[source] = {"hash": doc_hash, "chunks": chunk_ids}
+    print(f"전체 {len(wanted_ids)}개 청크 중 새로 임베딩할 청크 {len(new_chunks)}개\n")
 
     embedding_model = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
-    
+
     print(f"3. 임베딩 및 ChromaDB 저장을 시작합니다... (저장 경로: {CHROMA_DB_PATH})")
-    vectorstore = Chroma.from_documents(
-        documents=splits,
-        embedding=embedding_model,
-        persist_directory=CHROMA_DB_PATH
-    )
-    print("ChromaDB에 성공적으로 저장했습니다.\n")
+    if new_chunks:
+        _embed_and_store(collection, embedding_model, new_chunks)
+
+    # 삭제되었거나 내용이 바뀐 청크, 예전 전체 빌드로 중복 저장된 벡터를 지웁니다.
+    stale_ids = [chunk_id for chunk_id in existing_ids if chunk_id not in wanted_ids]
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+        print(f"더 이상 사용하지 않는 청크 {len(stale_ids)}개를 삭제했습니다.")
+
+    index_version = _sha256(f"{embedding_model.model}\n" + "\n".join(sorted(wanted_ids)))[:16]
+    # 같은 청크로 BM25 색인용 파일을 저장합니다. (검색 시 메모리에 역색인을 만듭니다)
+    LexicalIndex.from_collection(collection, index_version).save(RAG_LEXICAL_INDEX_PATH)
+    _save_manifest({
+        "index_version": index_version,
+        "embedding_model": embedding_model.model,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "documents": documents,
+    })
+    print(f"ChromaDB에 성공적으로 저장했습니다. (index_version: {index_version})\n")
+
+    # 이전에 내보낸 FAISS 인덱스가 있으면 백엔드 설정과 관계없이 다시 내보내 index_version을 맞춥니다.
+    if VECTOR_BACKEND == "faiss" or os.path.exists(FAISS_DOCSTORE_PATH):
+        from rag.faiss_store import export_from_chroma
+        print("4. Chroma 컬렉션을 FAISS 인덱스로 다시 내보냅니다...")
+        export_from_chroma()
 
 if __name__ == "__main__":
     # 이 스크립트를 직접 실행하면 벡터 DB를 생성/업데이트합니다.
-    build_and_save_vector_store()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="RAG 벡터 DB를 생성/업데이트합니다.")
+    parser.add_argument("--full", action="store_true", help="기존 벡터를 모두 지우고 처음부터 다시 임베딩")
+    args = parser.parse_args()
+    build_and_save_vector_store(full_rebuild=args.full)
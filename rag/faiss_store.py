@@ -0,0 +1,148 @@
+"""
+Chroma 대신 사용할 수 있는 FAISS 벡터 인덱스입니다.
+인덱스 파일은 IO_FLAG_MMAP_IFC로 열어 벡터 코드(flat/sq8/pq)까지 mmap하므로, 여러 uvicorn 워커가 같은 파일을 OS 페이지 캐시로 공유하고 각자 복사본을 메모리에 올리지 않습니다.
+(IO_FLAG_MMAP은 IVF 리스트만 mmap하므로 이 인덱스들에는 효과가 없습니다)
+문서 저장소에 내보낼 때의 index_version을 기록하고, 로드할 때 벡터 DB 매니페스트와 다르면 오래된 인덱스로 보고 사용하지 않습니다.
+
+Chroma 컬렉션 내보내기:
+    python -m rag.faiss_store [--quantization flat|sq8|pq]
+"""
+
+import os
+import json
+import argparse
+from typing import Any, List
+import numpy as np
+import faiss
+import chromadb
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from rag.retrieval_cache import read_index_version
+from config import (
+    CHROMA_DB_PATH, RAG_COLLECTION_NAME,
+    FAISS_INDEX_PATH, FAISS_DOCSTORE_PATH, FAISS_QUANTIZATION, FAISS_PQ_M,
+)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """코사인 유사도를 내적으로 계산하도록 벡터를 단위 길이로 맞춥니다."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def _build_index(vectors: np.ndarray, quantization: str):
+    """
+    양자화 방식에 맞는 내적 기반 FAISS 인덱스를 만듭니다.
+    - flat: 원본 float32 (정확도 최고, 메모리 최대)
+    - sq8: 차원별 int8 스칼라 양자화 (메모리 약 1/4)
+    - pq: 곱 양자화 (벡터당 FAISS_PQ_M 바이트)
+    """
+    dim = vectors.shape[1]
+    if quantization == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif quantization == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    elif quantization == "pq":
+        if dim % FAISS_PQ_M != 0:
+            raise ValueError(f"임베딩 차원({dim})이 FAISS_PQ_M({FAISS_PQ_M})으로 나누어떨어지지 않습니다.")
+        # 코드북 크기(2^nbits)는 학습 벡터 수보다 클 수 없으므로 작은 코퍼스에서는 비트 수를 줄입니다.
+        nbits = int(max(1, min(8, np.floor(np.log2(len(vectors))))))
+        index = faiss.IndexPQ(dim, FAISS_PQ_M, nbits, faiss.METRIC_INNER_PRODUCT)
+    else:
+        raise ValueError(f"지원하지 않는 FAISS_QUANTIZATION 값입니다: {quantization}")
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+def export_from_chroma(quantization: str = FAISS_QUANTIZATION):
+    """
+    Chroma 컬렉션에 저장된 임베딩을 다시 계산하지 않고 그대로 FAISS 인덱스 파일과 문서 저장소(JSON)로 내보냅니다.
+    """
+    client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    collection = client.get_collection(RAG_COLLECTION_NAME)
+    data = collection.get(include=["embeddings", "documents", "metadatas"])
+    if not data["ids"]:
+        raise ValueError(f"'{CHROMA_DB_PATH}'의 '{RAG_COLLECTION_NAME}' 컬렉션이 비어 있습니다.")
+
+    vectors = _normalize(np.asarray(data["embeddings"], dtype=np.float32))
+    index = _build_index(vectors, quantization)
+
+    index_version = read_index_version()
+
+    os.makedirs(os.path.dirname(FAISS_INDEX_PATH), exist_ok=True)
+    # 실행 중인 워커가 mmap으로 열어 둔 파일을 덮어쓰지 않도록 새 파일을 쓴 뒤 교체합니다.
+    tmp_index_path = f"{FAISS_INDEX_PATH}.tmp"
+    faiss.write_index(index, tmp_index_path)
+    tmp_docstore_path = f"{FAISS_DOCSTORE_PATH}.tmp"
+    with open(tmp_docstore_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "index_version": index_version,
+            "quantization": quantization,
+            "dimension": int(vectors.shape[1]),
+            "chunks": [
+                {"id": chunk_id, "text": text, "metadata": metadata or {}}
+                for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+            ],
+        }, f, ensure_ascii=False)
+    os.replace(tmp_index_path, FAISS_INDEX_PATH)
+    os.replace(tmp_docstore_path, FAISS_DOCSTORE_PATH)
+    print(f"FAISS 인덱스를 저장했습니다. ({len(data['ids'])}개 벡터, {quantization}, 경로: {FAISS_INDEX_PATH})")
+
+
+class FaissRetriever(BaseRetriever):
+    """mmap으로 연 FAISS 인덱스에서 쿼리 임베딩과 내적이 큰 청크를 찾는 Retriever"""
+
+    index: Any
+    chunks: List[dict]
+    embeddings: Any
+    k: int = 5
+
+    @classmethod
+    def load(cls, embeddings, k: int = 5):
+        """
+        문서 저장소를 로드하고 인덱스 파일을 읽기 전용 mmap으로 엽니다.
+        내보낸 뒤 벡터 DB를 다시 빌드해 index_version이 다르면 ValueError를 발생시킵니다.
+        """
+        with open(FAISS_DOCSTORE_PATH, "r", encoding="utf-8") as f:
+            docstore = json.load(f)
+        index_version = read_index_version()
+        if docstore.get("index_version") != index_version:
+            raise ValueError(
+                f"FAISS 인덱스(index_version: {docstore.get('index_version')})가 "
+                f"현재 벡터 DB(index_version: {index_version})와 다릅니다."
+            )
+        index = faiss.read_index(FAISS_INDEX_PATH, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        if index.ntotal != len(docstore["chunks"]):
+            raise ValueError(f"FAISS 인덱스 벡터 수({index.ntotal})와 문서 저장소 청크 수({len(docstore['chunks'])})가 다릅니다.")
+        return cls(index=index, chunks=docstore["chunks"], embeddings=embeddings, k=k)
+
+    def _search(self, vector: List[float]) -> List[Document]:
+        query = _normalize(np.asarray([vector], dtype=np.float32))
+        scores, positions = self.index.search(query, self.k)
+        return [
+            Document(
+                page_content=self.chunks[position]["text"],
+                metadata=self.chunks[position]["metadata"],
+                id=self.chunks[position]["id"],
+            )
+            for position in positions[0] if position >= 0
+        ]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._search(self.embeddings.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search(await self.embeddings.aembed_query(query))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chroma 컬렉션을 FAISS 인덱스로 내보냅니다.")
+    parser.add_argument(
+        "--quantization", choices=["flat", "sq8", "pq"], default=FAISS_QUANTIZATION,
+        help="flat(원본), sq8(int8 스칼라 양자화), pq(곱 양자화)",
+    )
+    args = parser.parse_args()
+    export_from_chroma(args.quantization)
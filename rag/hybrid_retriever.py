@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Reciprocal Rank Fusion 상수 (순위 1위와 10위의 점수 차이를 완만하게 함)
+RRF_K = 60
+
+def _doc_key(doc: Document) -> str:
+    return doc.id or doc.page_content
+
+def reciprocal_rank_fusion(rankings: list, k: int) -> list:
+    """여러 검색 결과 순위를 RRF 점수로 합쳐 상위 k개 문서를 반환합니다."""
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+    ordered = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in ordered]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 어휘 검색과 벡터(dense) 검색을 함께 쓰는 Retriever입니다.
+    mode:
+      - "dense": 벡터 검색만 사용 (쿼리마다 임베딩 API 호출)
+      - "lexical": BM25만 사용 (네트워크 호출 없음)
+      - "hybrid": 두 결과를 RRF로 결합. 벡터 검색이 실패하면 BM25 결과만 반환합니다.
+    """
+
+    lexical_index: Optional[Any] = None
+    dense_retriever: Optional[BaseRetriever] = None
+    mode: str = "hybrid"
+    k: int = 5
+
+    def _lexical(self, query: str) -> List[Document]:
+        if self.lexical_index is None:
+            return []
+        # 결합 시 후보를 넉넉히 가져옵니다.
+        return self.lexical_index.search_documents(query, self.k * 2 if self.mode == "hybrid" else self.k)
+
+    def _fuse(self, lexical_docs: List[Document], dense_docs) -> List[Document]:
+        if isinstance(dense_docs, Exception) or dense_docs is None:
+            if isinstance(dense_docs, Exception):
+                print(f"⚠️ 벡터 검색 실패, BM25 결과만 사용합니다: {dense_docs}")
+            return lexical_docs[:self.k]
+        return reciprocal_rank_fusion([dense_docs, lexical_docs], self.k)
+
+    def lexical_fallback(self, query: str, error: Exception) -> List[Document]:
+        """
+        벡터 검색에 쓸 쿼리 임베딩이 이미 실패한 경우, 임베딩을 다시 호출하지 않고 BM25 결과만 반환합니다.
+        BM25 색인이 없거나 dense 모드이면 error를 그대로 발생시킵니다.
+        """
+        if self.mode == "dense" or self.lexical_index is None:
+            raise error
+        return self._fuse(self._lexical(query), error)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.mode == "lexical" or self.dense_retriever is None:
+            return self._lexical(query)[:self.k]
+        if self.mode == "dense" or self.lexical_index is None:
+            return self.dense_retriever.invoke(query)
+        try:
+            dense_docs = self.dense_retriever.invoke(query)
+        except Exception as e:
+            dense_docs = e
+        return self._fuse(self._lexical(query), dense_docs)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.mode == "lexical" or self.dense_retriever is None:
+            return self._lexical(query)[:self.k]
+        if self.mode == "dense" or self.lexical_index is None:
+            return await self.dense_retriever.ainvoke(query)
+        # 벡터 검색(네트워크)을 기다리는 동안 BM25 결과를 미리 계산합니다.
+        dense_task = asyncio.ensure_future(self.dense_retriever.ainvoke(query))
+        lexical_docs = self._lexical(query)
+        try:
+            dense_docs = await dense_task
+        except Exception as e:
+            dense_docs = e
+        return self._fuse(lexical_docs, dense_docs)
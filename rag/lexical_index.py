@@ -0,0 +1,101 @@
+import os
+import re
+import json
+import math
+import heapq
+from collections import Counter
+from langchain_core.documents import Document
+
+# BM25 파라미터
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+def tokenize(text: str) -> list:
+    """
+    한국어 검색용 토큰화: 어절마다 문자 2-gram을 만듭니다. (한 글자 어절은 그대로 사용)
+    조사/어미가 붙어도 "화재가", "화재를"이 같은 "화재" 2-gram을 공유하므로 형태소 분석기 없이 매칭됩니다.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class LexicalIndex:
+    """청크 텍스트에 대한 메모리 상주 BM25 역색인"""
+
+    def __init__(self, chunks: list, index_version: str = None):
+        """chunks: [{"id", "text", "metadata"}]"""
+        self.index_version = index_version
+        self.chunks = chunks
+        self._postings = {}   # {토큰: [(청크 번호, 빈도)]}
+        self._lengths = []
+        for index, chunk in enumerate(chunks):
+            counts = Counter(tokenize(chunk["text"]))
+            self._lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((index, tf))
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        total = len(chunks)
+        self._idf = {
+            token: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self._postings.items()
+        }
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query: str, k: int = 5) -> list:
+        """BM25 점수 상위 k개 청크를 [(청크 번호, 점수)]로 반환합니다."""
+        scores = {}
+        for token, query_tf in Counter(tokenize(query)).items():
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf[token]
+            for index, tf in postings:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[index] / self._avg_length)
+                scores[index] = scores.get(index, 0.0) + query_tf * idf * tf * (BM25_K1 + 1) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def search_documents(self, query: str, k: int = 5) -> list:
+        return [self.to_document(index) for index, _ in self.search(query, k)]
+
+    def to_document(self, index: int) -> Document:
+        chunk = self.chunks[index]
+        return Document(page_content=chunk["text"], metadata=chunk.get("metadata") or {}, id=chunk["id"])
+
+    # --- 저장/로드 ---
+
+    def save(self, path: str):
+        """청크 원문을 저장합니다. 역색인은 로드 시 메모리에서 다시 만듭니다."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"index_version": self.index_version, "chunks": self.chunks}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """저장된 청크 파일로 색인을 만듭니다. 파일이 없으면 None을 반환합니다."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cls(data.get("chunks", []), data.get("index_version"))
+
+    @classmethod
+    def from_collection(cls, collection, index_version: str = None):
+        """Chroma 컬렉션에 저장된 청크로 색인을 만듭니다. (네트워크 호출 없음)"""
+        data = collection.get(include=["documents", "metadatas"])
+        chunks = [
+            {"id": chunk_id, "text": text, "metadata": metadata or {}}
+            for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+            if text
+        ]
+        return cls(chunks, index_version)
@@ -0,0 +1,288 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from config import (
+    RAG_MANIFEST_PATH, RAG_EMBEDDING_CACHE_PATH, RAG_EMBEDDING_CACHE_SIZE,
+    RAG_RETRIEVAL_CACHE_SIZE, RAG_RETRIEVAL_CACHE_TTL, RAG_RETRIEVAL_LSH_BITS, RAG_RETRIEVAL_CACHE_SIMILARITY,
+)
+
+def normalize_query(text: str) -> str:
+    """유니코드 정규화, 소문자화, 공백 정리로 표기만 다른 쿼리를 같은 키로 만듭니다."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+_version_lock = threading.Lock()
+_version_state = {"mtime": None, "version": None}
+
+def read_index_version() -> Optional[str]:
+    """
+    벡터 DB 매니페스트의 index_version을 반환합니다.
+    매니페스트 파일이 바뀐 경우에만 다시 읽으므로, 재빌드 후에는 다음 쿼리부터 새 버전이 적용됩니다.
+    """
+    try:
+        mtime = os.stat(RAG_MANIFEST_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _version_lock:
+        if mtime != _version_state["mtime"]:
+            try:
+                with open(RAG_MANIFEST_PATH, "r", encoding="utf-8") as f:
+                    _version_state["version"] = json.load(f).get("index_version")
+            except (OSError, json.JSONDecodeError):
+                _version_state["version"] = None
+            _version_state["mtime"] = mtime
+        return _version_state["version"]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    쿼리 임베딩을 메모리 LRU + SQLite 파일에 캐시하는 Embeddings 래퍼입니다.
+    키는 (index_version, 정규화된 쿼리)이므로 인덱스를 다시 빌드하면 이전 캐시는 사용되지 않습니다.
+    문서 임베딩(embed_documents)은 캐시하지 않습니다.
+    """
+
+    def __init__(self, embeddings: Embeddings, path: str = RAG_EMBEDDING_CACHE_PATH, max_size: int = RAG_EMBEDDING_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.max_size = max_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, index_version TEXT, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 쿼리 임베딩 캐시 파일을 열 수 없어 메모리 캐시만 사용합니다: {e}")
+                self._conn = None
+
+    def _key(self, text: str, index_version: Optional[str]) -> str:
+        return hashlib.sha256(f"{index_version}\n{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def _get(self, key: str):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            vector = array("f", row[0]).tolist()
+            self._remember(key, vector)
+            return vector
+
+    def _remember(self, key: str, vector: list):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _set(self, key: str, vector: list, index_version: Optional[str]):
+        with self._lock:
+            self._remember(key, vector)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, index_version, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (key, index_version, array("f", vector).tobytes(), time.time()),
+                )
+                # 이전 인덱스 버전의 임베딩은 정리합니다.
+                self._conn.execute(
+                    "DELETE FROM query_embeddings WHERE index_version IS NOT ?", (index_version,)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ 쿼리 임베딩 캐시 저장 실패: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        index_version = read_index_version()
+        key = self._key(text, index_version)
+        vector = self._get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._set(key, vector, index_version)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        index_version = read_index_version()
+        key = self._key(text, index_version)
+        vector = self._get(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self._set(key, vector, index_version)
+        return vector
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    검색 결과를 index_version별로 캐시하는 Retriever 래퍼입니다.
+    - 정규화된 쿼리 텍스트가 같으면 그대로 재사용합니다.
+    - 텍스트가 달라도 쿼리 임베딩의 LSH 버킷(랜덤 초평면 부호 패턴)이 같은 항목 중
+      코사인 유사도가 similarity 이상인 항목이 있으면 재사용합니다. (버킷은 후보를 좁히는 용도일 뿐, 버킷만 같아서는 재사용하지 않음)
+    embeddings가 없으면(어휘 검색 전용) 텍스트가 같은 경우만 재사용합니다.
+    """
+
+    retriever: BaseRetriever
+    embeddings: Optional[Any] = None
+    max_size: int = RAG_RETRIEVAL_CACHE_SIZE
+    ttl: float = RAG_RETRIEVAL_CACHE_TTL
+    lsh_bits: int = RAG_RETRIEVAL_LSH_BITS
+    similarity: float = RAG_RETRIEVAL_CACHE_SIMILARITY
+
+    _cache: Any = None
+    _buckets: Any = None
+    _planes: Any = None
+    _lock: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        self._cache = OrderedDict()   # {텍스트 키: (문서 목록, 만료 시각, 정규화된 쿼리 임베딩 또는 None, 버킷 키 또는 None)}
+        self._buckets = {}            # {버킷 키: {텍스트 키}}
+        self._lock = threading.Lock()
+
+    def _bucket(self, vector: np.ndarray) -> str:
+        if self._planes is None or self._planes.shape[1] != len(vector):
+            # 고정 시드의 랜덤 초평면: 프로세스가 달라도 같은 버킷을 만듭니다.
+            self._planes = np.random.default_rng(0).standard_normal((self.lsh_bits, len(vector)))
+        bits = (self._planes @ vector) > 0
+        return "".join("1" if bit else "0" for bit in bits)
+
+    def _unit_vector(self, vector: list) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _remove(self, key: str):
+        """캐시 항목과 버킷 색인을 함께 지웁니다. (self._lock 안에서 호출)"""
+        entry = self._cache.pop(key, None)
+        if entry is not None and entry[3] is not None:
+            members = self._buckets.get(entry[3])
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[entry[3]]
+
+    def _lookup(self, key: str, vector: Optional[np.ndarray] = None, bucket: Optional[str] = None):
+        """텍스트 키가 같은 항목, 없으면 같은 버킷에서 코사인 유사도가 기준 이상인 가장 가까운 항목의 문서를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            candidates = [key]
+            if vector is not None and bucket is not None:
+                candidates += [member for member in self._buckets.get(bucket, ()) if member != key]
+
+            best_key, best_score = None, self.similarity
+            for candidate in candidates:
+                entry = self._cache.get(candidate)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    self._remove(candidate)
+                    continue
+                if candidate == key:
+                    best_key = candidate
+                    break
+                if entry[2] is None:
+                    continue
+                score = float(entry[2] @ vector)
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+
+            if best_key is None:
+                return None
+            self._cache.move_to_end(best_key)
+            return self._cache[best_key][0]
+
+    def _store(self, key: str, docs: List[Document], vector: Optional[np.ndarray] = None, bucket: Optional[str] = None):
+        with self._lock:
+            self._remove(key)
+            self._cache[key] = (docs, time.time() + self.ttl, vector, bucket)
+            if bucket is not None:
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._cache) > self.max_size:
+                self._remove(next(iter(self._cache)))
+
+    def _vector_and_bucket(self, index_version: Optional[str], embedding: list):
+        vector = self._unit_vector(embedding)
+        if vector is None:
+            return None, None
+        return vector, f"{index_version}:{self._bucket(vector)}"
+
+    def _without_embedding(self, query: str, error: Exception) -> List[Document]:
+        """
+        쿼리 임베딩이 실패한 경우 임베딩을 다시 시도하지 않도록 하위 Retriever의 어휘 검색만 사용합니다.
+        (하위 Retriever의 벡터 검색도 같은 임베딩 API를 호출하므로, 그대로 맡기면 장애 중 쿼리마다 실패를 두 번 기다리게 됩니다)
+        """
+        lexical_fallback = getattr(self.retriever, "lexical_fallback", None)
+        if lexical_fallback is None:
+            raise error
+        return lexical_fallback(query, error)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        index_version = read_index_version()
+        key = f"{index_version}:{normalize_query(query)}"
+        docs = self._lookup(key)
+        if docs is not None:
+            return docs
+
+        vector = bucket = None
+        if self.embeddings is not None:
+            try:
+                vector, bucket = self._vector_and_bucket(index_version, self.embeddings.embed_query(query))
+            except Exception as e:
+                print(f"⚠️ 쿼리 임베딩 실패, 검색 결과 캐시를 사용하지 않습니다: {e}")
+                return self._without_embedding(query, e)
+            docs = self._lookup(key, vector, bucket)
+        if docs is None:
+            docs = self.retriever.invoke(query)
+            self._store(key, docs, vector, bucket)
+        return docs
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        index_version = read_index_version()
+        key = f"{index_version}:{normalize_query(query)}"
+        docs = self._lookup(key)
+        if docs is not None:
+            return docs
+
+        vector = bucket = None
+        if self.embeddings is not None:
+            try:
+                vector, bucket = self._vector_and_bucket(index_version, await self.embeddings.aembed_query(query))
+            except Exception as e:
+                print(f"⚠️ 쿼리 임베딩 실패, 검색 결과 캐시를 사용하지 않습니다: {e}")
+                return self._without_embedding(query, e)
+            docs = self._lookup(key, vector, bucket)
+        if docs is None:
+            docs = await self.retriever.ainvoke(query)
+            self._store(key, docs, vector, bucket)
+        return docs
@@ -1,27 +1,94 @@
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-from config import CHROMA_DB_PATH, OPENAI_API_KEY
+from rag.lexical_index import LexicalIndex
+from rag.hybrid_retriever import HybridRetriever
+from rag.retrieval_cache import CachedEmbeddings, CachedRetriever
+from config import (
+    CHROMA_DB_PATH, OPENAI_API_KEY, RAG_COLLECTION_NAME, RAG_LEXICAL_INDEX_PATH, RAG_RETRIEVAL_MODE, RAG_QUERY_CACHE,
+    VECTOR_BACKEND,
+)
+
+RETRIEVER_K = 5
+
+def _load_lexical_index(vectorstore, faiss_retriever=None):
+    """빌드 시 저장한 BM25 청크 파일을 로드하고, 없으면 FAISS 문서 저장소나 Chroma 컬렉션에서 바로 만듭니다."""
+    lexical_index = LexicalIndex.load(RAG_LEXICAL_INDEX_PATH)
+    if lexical_index is None and faiss_retriever is not None:
+        lexical_index = LexicalIndex(faiss_retriever.chunks)
+    if lexical_index is None and vectorstore is not None:
+        lexical_index = LexicalIndex.from_collection(vectorstore._collection)
+    return lexical_index
+
+def _load_faiss_retriever(embedding_model):
+    """FAISS 백엔드 Retriever를 로드합니다. (faiss는 이 백엔드를 선택한 경우에만 import합니다)"""
+    from rag.faiss_store import FaissRetriever
+    return FaissRetriever.load(embedding_model, k=RETRIEVER_K)
 
 def initialize_vector_store():
     """
-    저장된 ChromaDB를 로드하여 Retriever 객체를 생성하고 반환합니다.
+    저장된 벡터 DB(VECTOR_BACKEND: ChromaDB 또는 FAISS)를 로드하여 Retriever 객체를 생성하고 반환합니다.
+    RAG_RETRIEVAL_MODE에 따라 벡터 검색, BM25 어휘 검색, 또는 둘을 결합한 검색을 사용합니다.
     """
-    if not OPENAI_API_KEY:
+    if RAG_RETRIEVAL_MODE != "lexical" and not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
 
-    embedding_model = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
-    
-    try:
-        vectorstore = Chroma(
-            persist_directory=CHROMA_DB_PATH,
-            embedding_function=embedding_model
-        )
-        print("RAG Retriever가 성공적으로 준비되었습니다.")
-        return vectorstore.as_retriever(search_kwargs={"k": 5})
-    except Exception as e:
-        print(f"ChromaDB 로드 중 오류 발생: {e}")
-        print(f"'{CHROMA_DB_PATH}' 경로에 DB 파일이 존재하는지 확인하거나, 'build_vector_store.py'를 실행하여 DB를 생성해주세요.")
+    vectorstore = None
+    faiss_retriever = None
+    embedding_model = None
+    if RAG_RETRIEVAL_MODE != "lexical":
+        embedding_model = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
+        if RAG_QUERY_CACHE:
+            embedding_model = CachedEmbeddings(embedding_model)
+
+    if VECTOR_BACKEND == "faiss":
+        try:
+            faiss_retriever = _load_faiss_retriever(embedding_model)
+        except Exception as e:
+            print(f"FAISS 인덱스 로드 중 오류 발생: {e}")
+            print("'python -m rag.faiss_store'를 실행하여 Chroma 컬렉션을 FAISS 인덱스로 내보내주세요. ChromaDB로 대체합니다.")
+
+    if faiss_retriever is None:
+        try:
+            if embedding_model is not None:
+                vectorstore = Chroma(
+                    collection_name=RAG_COLLECTION_NAME,
+                    persist_directory=CHROMA_DB_PATH,
+                    embedding_function=embedding_model
+                )
+            else:
+                vectorstore = Chroma(collection_name=RAG_COLLECTION_NAME, persist_directory=CHROMA_DB_PATH)
+        except Exception as e:
+            print(f"ChromaDB 로드 중 오류 발생: {e}")
+            print(f"'{CHROMA_DB_PATH}' 경로에 DB 파일이 존재하는지 확인하거나, 'build_vector_store.py'를 실행하여 DB를 생성해주세요.")
+
+    lexical_index = None
+    if RAG_RETRIEVAL_MODE in ("hybrid", "lexical"):
+        try:
+            lexical_index = _load_lexical_index(vectorstore, faiss_retriever)
+            print(f"BM25 색인을 메모리에 로드했습니다. ({len(lexical_index)}개 청크)")
+        except Exception as e:
+            print(f"BM25 색인 로드 중 오류 발생: {e}")
+
+    dense_retriever = None
+    if RAG_RETRIEVAL_MODE != "lexical":
+        if faiss_retriever is not None:
+            dense_retriever = faiss_retriever
+        elif vectorstore is not None:
+            dense_retriever = vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_K})
+    if dense_retriever is None and lexical_index is None:
         return None
 
+    backend = "faiss" if faiss_retriever is not None else "chroma"
+    print(f"RAG Retriever가 성공적으로 준비되었습니다. (mode: {RAG_RETRIEVAL_MODE}, backend: {backend})")
+    retriever = HybridRetriever(
+        lexical_index=lexical_index,
+        dense_retriever=dense_retriever,
+        mode=RAG_RETRIEVAL_MODE,
+        k=RETRIEVER_K,
+    )
+    if RAG_QUERY_CACHE:
+        retriever = CachedRetriever(retriever=retriever, embeddings=embedding_model if dense_retriever else None)
+    return retriever
+
 # 모듈 로드 시 Retriever 인스턴스 생성
-retriever = initialize_vector_store()
\ No newline at end of file
+retriever = initialize_vector_store()
@@ -8,6 +8,7 @@ class GraphState(TypedDict):
     """
     messages: Annotated[List[BaseMessage], add_messages]
     question: str
+    user_id: str
     news: str
     GPS: Dict[str, Any]
     SNS: str
@@ -1,6 +1,8 @@
 import streamlit as st
 import asyncio
+import uuid
 from main import run_workflow
+from config import LOCATION_PAGE_URL
 
 st.set_page_config(page_title="🚨 재난 대응 AI 에이전트", page_icon="🔥", layout="centered")
 st.title("🔥 재난 대응 AI 에이전트")
@@ -10,7 +12,10 @@ st.caption("현재 위치를 기반으로 실시간 재난 정보를 분석합
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "thread_id" not in st.session_state:
-    st.session_state.thread_id = "streamlit-user-1234"
+    # 세션마다 고유한 ID를 사용해 대화 기록과 위치를 사용자별로 구분합니다.
+    st.session_state.thread_id = f"streamlit-{uuid.uuid4().hex[:12]}"
+
+st.caption(f"📍 [내 위치 공유하기]({LOCATION_PAGE_URL}/?user_id={st.session_state.thread_id})")
 
 # --- 입력 ---
 prompt = st.chat_input("궁금한 재난 상황을 입력하세요 (예: 강남역 근처 화재)")
@@ -52,7 +57,11 @@ else:
         with st.spinner("AI 에이전트가 분석 중입니다..."):
             try:
                 response = asyncio.run(
-                    run_workflow(msgs[-2]["content"], thread_id=st.session_state.thread_id)
+                    run_workflow(
+                        msgs[-2]["content"],
+                        thread_id=st.session_state.thread_id,
+                        user_id=st.session_state.thread_id,
+                    )
                 )
             except Exception as e:
                 response = f"죄송합니다. 오류가 발생했습니다: {e}"
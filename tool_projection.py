@@ -0,0 +1,183 @@
+import json
+import tiktoken
+from langchain_core.tools import StructuredTool
+from config import MODEL_NAME, TOOL_OUTPUT_TEXT_TOKENS
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model(MODEL_NAME)
+        except Exception:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    return _encoding
+
+def truncate_tokens(text, max_tokens: int = TOOL_OUTPUT_TEXT_TOKENS):
+    """긴 텍스트를 토큰 예산에 맞게 자릅니다."""
+    if not isinstance(text, str) or max_tokens <= 0 or len(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "…(생략)"
+
+def _pick(data, keys):
+    if not isinstance(data, dict):
+        return data
+    return {key: data[key] for key in keys if data.get(key) not in (None, "", [], {})}
+
+def _truncate_strings(value):
+    """모든 문자열 값에 토큰 예산을 적용합니다."""
+    if isinstance(value, str):
+        return truncate_tokens(value)
+    if isinstance(value, list):
+        return [_truncate_strings(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _truncate_strings(item) for key, item in value.items()}
+    return value
+
+# --- 도구별 프로젝션: 프롬프트와 파이프라인이 실제로 사용하는 필드만 원래 구조대로 남깁니다. ---
+
+ERROR_KEYS = ("status", "message", "error", "details")
+
+def _project_search_videos(data):
+    if not isinstance(data, dict) or "items" not in data:
+        return data
+    return {"items": [
+        {
+            "id": _pick(item.get("id"), ("videoId",)),
+            "snippet": _pick(item.get("snippet"), ("title", "description", "channelTitle", "publishedAt")),
+        }
+        for item in data["items"]
+    ]}
+
+def _project_video_details(data):
+    if not isinstance(data, dict) or "items" not in data:
+        return data
+    return {"items": [
+        {
+            "id": item.get("id"),
+            "snippet": _pick(item.get("snippet"), ("title", "description", "channelTitle", "publishedAt", "tags")),
+            "statistics": _pick(item.get("statistics"), ("viewCount", "likeCount", "commentCount")),
+            "contentDetails": _pick(item.get("contentDetails"), ("duration",)),
+        }
+        for item in data["items"]
+    ]}
+
+def _project_video_comments(data):
+    if not isinstance(data, dict):
+        return data
+    items = []
+    for item in data.get("items", []):
+        comment = ((item.get("snippet") or {}).get("topLevelComment") or {}).get("snippet") or {}
+        items.append({"snippet": {"topLevelComment": {"snippet": _pick(comment, ("textDisplay", "publishedAt", "likeCount"))}}})
+    return {**_pick(data, ERROR_KEYS), "items": items}
+
+def _project_naver_news(data):
+    if not isinstance(data, dict) or "items" not in data:
+        return data
+    return {"items": [
+        _pick(item, ("title", "description", "link", "originallink", "pubDate"))
+        for item in data["items"]
+    ]}
+
+def _project_safety_data(data):
+    """safetydata.go.kr 응답: 결과 코드와 행 데이터만 남깁니다."""
+    if not isinstance(data, dict):
+        return data
+    projected = _pick(data, ("resultCode", "resultMsg", "totalCount", "scannedCount", "source"))
+    if data.get("header"):
+        projected["header"] = _pick(data["header"], ("resultCode", "resultMsg", "errorMsg"))
+    if "body" in data:
+        projected["body"] = data["body"]
+    return projected
+
+def _project_nearby_events(data):
+    if not isinstance(data, dict) or not isinstance(data.get("results"), dict):
+        return _project_safety_data(data)
+    return {
+        **_pick(data, ("address", "radius_km")),
+        "results": {source: _project_safety_data(payload) for source, payload in data["results"].items()},
+    }
+
+def _project_scrape(data):
+    if not isinstance(data, dict):
+        return data
+    projected = _pick(data, ("status", "url", "cached", "message"))
+    if isinstance(data.get("extracted"), dict):
+        # paragraphs는 body와 내용이 같으므로 제외합니다.
+        projected["extracted"] = _pick(data["extracted"], ("title", "published_at", "body"))
+    return projected
+
+def _project_scrape_batch(data):
+    if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+        return data
+    return {**_pick(data, ("status", "message")), "results": [_project_scrape(item) for item in data["results"]]}
+
+def _project_threads(data):
+    if not isinstance(data, list):
+        return data
+    return [
+        {
+            **_pick(thread, ("id", "text", "timestamp", "permalink")),
+            "replies": [_pick(reply, ("text", "timestamp")) for reply in thread.get("replies", [])],
+        }
+        for thread in data
+    ]
+
+PROJECTIONS = {
+    "searchVideos": _project_search_videos,
+    "getVideoDetails": _project_video_details,
+    "getVideoComments": _project_video_comments,
+    "get_naver_news": _project_naver_news,
+    "get_yonhap_news": _project_safety_data,
+    "getDisasterMessage": _project_safety_data,
+    "getForestFires": _project_safety_data,
+    "getKMAWeatherWarning": _project_safety_data,
+    "getNearbyDisasterEvents": _project_nearby_events,
+    "scrape": _project_scrape,
+    "scrape_batch": _project_scrape_batch,
+    "get_fire_related_threads_with_replies": _project_threads,
+}
+
+def project_output(tool_name: str, content):
+    """
+    도구 출력(JSON 텍스트)에서 필요한 필드만 남기고, 긴 텍스트는 토큰 예산에 맞게 자른 뒤 compact JSON으로 반환합니다.
+    """
+    if isinstance(content, list):
+        return [project_output(tool_name, item) if isinstance(item, str) else item for item in content]
+    if not isinstance(content, str):
+        return content
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return truncate_tokens(content)
+
+    projector = PROJECTIONS.get(tool_name)
+    if projector is not None:
+        data = projector(data)
+    return json.dumps(_truncate_strings(data), ensure_ascii=False, separators=(",", ":"))
+
+def project_tool(tool: StructuredTool) -> StructuredTool:
+    """도구 실행 결과가 LLM에 전달되기 전에 project_output을 적용하도록 감쌉니다."""
+    original = tool.coroutine
+    tool_name = tool.name
+
+    async def call_tool(**arguments):
+        result = await original(**arguments)
+        if tool.response_format == "content_and_artifact":
+            content, artifact = result
+            return project_output(tool_name, content), artifact
+        return project_output(tool_name, result)
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        coroutine=call_tool,
+        response_format=tool.response_format,
+        metadata=tool.metadata,
+    )
\ No newline at end of file
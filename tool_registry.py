@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import json
+from config import TOOL_OUTPUT_PROJECTION
+from mcp_client import MCPClientManager, PooledMCPClient
+from tool_projection import project_tool
+
+# 에이전트별로 사용할 도구 이름
+AGENT_TOOL_NAMES = {
+    "gps": {"get_latest_location"},
+    "news": {"get_naver_news", "get_yonhap_news", "scrape", "scrape_batch"},
+    "sns": {"getVideoDetails", "searchVideos", "getTranscripts", "getVideoComments", "getVideoBundles", "get_fire_related_threads_with_replies"},
+    "disaster": {"getDisasterMessage", "getForestFires", "getKMAWeatherWarning", "getNearbyDisasterEvents"},
+}
+
+def schema_hash(tools) -> str:
+    """도구 이름, 설명, 입력 스키마로 서버의 스키마 해시를 계산합니다."""
+    catalog = []
+    for tool in sorted(tools, key=lambda t: t.name):
+        args_schema = tool.args_schema
+        if not isinstance(args_schema, dict):
+            args_schema = tool.tool_call_schema.model_json_schema()
+        catalog.append({"name": tool.name, "description": tool.description, "args": args_schema})
+    encoded = json.dumps(catalog, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ToolRegistry:
+    """
+    MCP 서버의 도구 목록을 한 번만 조회하여 캐시하고, 에이전트별 도구 묶음을 미리 계산해 제공합니다.
+    서버 세션이 재시작되었거나 스키마 해시가 바뀐 경우에만 다시 조회합니다.
+    """
+    _client = None
+    # server_name -> {"generation": int | None, "hash": str, "tools": list}
+    _servers = {}
+    _partitions = None
+    _lock = None
+    _lock_loop = None
+
+    @classmethod
+    def _server_generation(cls, client, server_name):
+        if isinstance(client, PooledMCPClient):
+            return client.pools[server_name].generation
+        # 풀을 사용하지 않는 클라이언트는 재시작을 알 수 없으므로 최초 1회만 조회합니다.
+        return None
+
+    @classmethod
+    def _server_names(cls, client):
+        if isinstance(client, PooledMCPClient):
+            return list(client.pools)
+        return list(client.connections)
+
+    @classmethod
+    async def _discover(cls, client, server_name) -> bool:
+        """서버의 도구를 다시 조회하고, 스키마가 바뀌었으면 True를 반환합니다."""
+        generation = cls._server_generation(client, server_name)
+        if isinstance(client, PooledMCPClient):
+            pool = client.pools[server_name]
+            session_tools = await pool.list_tools()
+            new_hash = schema_hash(session_tools)
+            cached = cls._servers.get(server_name)
+            if cached and cached["hash"] == new_hash:
+                # 스키마가 같으면 기존 도구 객체를 그대로 재사용합니다.
+                cached["generation"] = generation
+                return False
+            tools = [pool.pooled_tool(tool) for tool in session_tools]
+        else:
+            tools = await client.get_tools(server_name=server_name)
+            new_hash = schema_hash(tools)
+            cached = cls._servers.get(server_name)
+            if cached and cached["hash"] == new_hash:
+                cached["generation"] = generation
+                return False
+
+        if TOOL_OUTPUT_PROJECTION:
+            tools = [project_tool(tool) for tool in tools]
+
+        print(f"--- [Tool Registry] '{server_name}' 도구 {len(tools)}개 등록 (schema {new_hash[:12]}) ---")
+        cls._servers[server_name] = {"generation": generation, "hash": new_hash, "tools": tools}
+        return True
+
+    @classmethod
+    def _build_partitions(cls):
+        all_tools = [tool for server in cls._servers.values() for tool in server["tools"]]
+        cls._partitions = {
+            agent: [tool for tool in all_tools if tool.name in names]
+            for agent, names in AGENT_TOOL_NAMES.items()
+        }
+
+    @classmethod
+    async def get_partitions(cls) -> dict:
+        """
+        에이전트 이름(gps, news, sns, disaster)을 키로 하는 도구 목록 딕셔너리를 반환합니다.
+        """
+        client = await MCPClientManager.get_client()
+        if cls._client is not client:
+            # 클라이언트가 바뀌면 기존 도구는 더 이상 유효하지 않습니다.
+            cls._client = client
+            cls._servers = {}
+            cls._partitions = None
+        loop = asyncio.get_running_loop()
+        if cls._lock is None or cls._lock_loop is not loop:
+            # asyncio.Lock은 이벤트 루프에 묶이므로, 호출하는 루프가 바뀌면 새로 만듭니다.
+            cls._lock = asyncio.Lock()
+            cls._lock_loop = loop
+
+        async with cls._lock:
+            stale = [
+                name for name in cls._server_names(client)
+                if name not in cls._servers
+                or cls._servers[name]["generation"] != cls._server_generation(client, name)
+            ]
+            if stale:
+                changed = await asyncio.gather(*(cls._discover(client, name) for name in stale))
+                if any(changed) or cls._partitions is None:
+                    cls._build_partitions()
+        return cls._partitions
+
+    @classmethod
+    def invalidate(cls):
+        """캐시된 도구 목록을 비워 다음 요청에서 다시 조회하도록 합니다."""
+        cls._servers = {}
+        cls._partitions = None
\ No newline at end of file